@@ -27,6 +27,58 @@ def calculate_1rm_estimate(weight, reps, formula='epley'):
     
     return round(formulas.get(formula, formulas['epley']), 1)
 
+# Intensity, volume and rest prescriptions per training goal
+LOAD_PRESCRIPTIONS = {
+    'strength': {
+        'intensity_range': (85, 100),
+        'reps_range': (1, 6),
+        'sets_range': (3, 6),
+        'rest_time': '3-5 minutes',
+        'frequency': '2-3x/week',
+        'progression': '2-10% when target reps achieved'
+    },
+    'hypertrophy': {
+        'intensity_range': (67, 85),
+        'reps_range': (6, 12),
+        'sets_range': (3, 6),
+        'rest_time': '30-90 seconds',
+        'frequency': '2-3x/week',
+        'progression': '2-5% when target reps achieved'
+    },
+    'power': {
+        'intensity_range': (75, 95),
+        'reps_range': (1, 5),
+        'sets_range': (3, 5),
+        'rest_time': '2-5 minutes',
+        'frequency': '3x/week',
+        'progression': 'Focus on speed of movement, then load'
+    },
+    'endurance': {
+        'intensity_range': (50, 67),
+        'reps_range': (12, 20),
+        'sets_range': (2, 3),
+        'rest_time': '30 seconds',
+        'frequency': '3-4x/week',
+        'progression': 'Increase reps first, then load'
+    },
+    'rehab_early': {
+        'intensity_range': (40, 60),
+        'reps_range': (10, 15),
+        'sets_range': (2, 3),
+        'rest_time': '60-90 seconds',
+        'frequency': '3-5x/week',
+        'progression': 'Pain-free range, then reps, then load'
+    },
+    'rehab_late': {
+        'intensity_range': (60, 80),
+        'reps_range': (8, 12),
+        'sets_range': (3, 4),
+        'rest_time': '90-120 seconds',
+        'frequency': '3-4x/week',
+        'progression': '5% increases when form maintained'
+    }
+}
+
 def calculate_training_loads(one_rm, training_goal):
     """
     Calculate training loads based on % 1RM for different goals
@@ -35,58 +87,7 @@ def calculate_training_loads(one_rm, training_goal):
               Baechle TR, Earle RW. Essentials of Strength Training. 4th ed.
     """
     
-    load_prescriptions = {
-        'strength': {
-            'intensity_range': (85, 100),
-            'reps_range': (1, 6),
-            'sets_range': (3, 6),
-            'rest_time': '3-5 minutes',
-            'frequency': '2-3x/week',
-            'progression': '2-10% when target reps achieved'
-        },
-        'hypertrophy': {
-            'intensity_range': (67, 85),
-            'reps_range': (6, 12),
-            'sets_range': (3, 6),
-            'rest_time': '30-90 seconds',
-            'frequency': '2-3x/week',
-            'progression': '2-5% when target reps achieved'
-        },
-        'power': {
-            'intensity_range': (75, 95),
-            'reps_range': (1, 5),
-            'sets_range': (3, 5),
-            'rest_time': '2-5 minutes',
-            'frequency': '3x/week',
-            'progression': 'Focus on speed of movement, then load'
-        },
-        'endurance': {
-            'intensity_range': (50, 67),
-            'reps_range': (12, 20),
-            'sets_range': (2, 3),
-            'rest_time': '30 seconds',
-            'frequency': '3-4x/week',
-            'progression': 'Increase reps first, then load'
-        },
-        'rehab_early': {
-            'intensity_range': (40, 60),
-            'reps_range': (10, 15),
-            'sets_range': (2, 3),
-            'rest_time': '60-90 seconds',
-            'frequency': '3-5x/week',
-            'progression': 'Pain-free range, then reps, then load'
-        },
-        'rehab_late': {
-            'intensity_range': (60, 80),
-            'reps_range': (8, 12),
-            'sets_range': (3, 4),
-            'rest_time': '90-120 seconds',
-            'frequency': '3-4x/week',
-            'progression': '5% increases when form maintained'
-        }
-    }
-    
-    prescription = load_prescriptions.get(training_goal, load_prescriptions['rehab_early'])
+    prescription = LOAD_PRESCRIPTIONS.get(training_goal, LOAD_PRESCRIPTIONS['rehab_early'])
     
     # Calculate specific loads
     min_intensity, max_intensity = prescription['intensity_range']
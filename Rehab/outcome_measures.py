@@ -6,6 +6,17 @@ Scientifically validated assessment tools for rehabilitation
 import pandas as pd
 from datetime import datetime
 
+# IKDC Scoring weights (simplified version - key questions)
+IKDC_QUESTIONS = {
+    'pain_level': {'weight': 10, 'reverse': True},  # 0=severe, 10=none
+    'swelling': {'weight': 5, 'reverse': True},     # 0=severe, 4=none  
+    'locking': {'weight': 5, 'reverse': True},      # 0=constant, 4=never
+    'instability': {'weight': 10, 'reverse': True}, # 0=constant, 4=never
+    'activity_level': {'weight': 10, 'reverse': False}, # 0=unable, 4=normal
+    'function_score': {'weight': 15, 'reverse': False}, # 0=cannot do, 4=no difficulty
+    'sports_participation': {'weight': 5, 'reverse': False} # 0=unable, 4=normal
+}
+
 def calculate_ikdc_score(responses):
     """
     Calculate IKDC (International Knee Documentation Committee) Score
@@ -19,34 +30,11 @@ def calculate_ikdc_score(responses):
         dict: Contains score, interpretation, and recommendations
     """
     
-    # IKDC Scoring weights (simplified version - key questions)
-    questions = {
-        'pain_level': {'weight': 10, 'reverse': True},  # 0=severe, 10=none
-        'swelling': {'weight': 5, 'reverse': True},     # 0=severe, 4=none  
-        'locking': {'weight': 5, 'reverse': True},      # 0=constant, 4=never
-        'instability': {'weight': 10, 'reverse': True}, # 0=constant, 4=never
-        'activity_level': {'weight': 10, 'reverse': False}, # 0=unable, 4=normal
-        'function_score': {'weight': 15, 'reverse': False}, # 0=cannot do, 4=no difficulty
-        'sports_participation': {'weight': 5, 'reverse': False} # 0=unable, 4=normal
-    }
-    
-    total_score = 0
-    max_possible = 0
-    
-    for question, config in questions.items():
-        if question in responses:
-            value = responses[question]
-            weight = config['weight']
-            
-            if config['reverse']:
-                # Higher values = better (reverse scoring)
-                score = value * weight
-            else:
-                # Lower values = better (normal scoring)  
-                score = value * weight
-                
-            total_score += score
-            max_possible += 4 * weight  # Max response = 4
+    # Every item is scored out of 4, so only answered items count toward the maximum
+    answered = [(responses[question], config['weight'])
+                for question, config in IKDC_QUESTIONS.items() if question in responses]
+    total_score = sum(value * weight for value, weight in answered)
+    max_possible = sum(4 * weight for _, weight in answered)
     
     # Convert to percentage
     ikdc_score = (total_score / max_possible) * 100 if max_possible > 0 else 0
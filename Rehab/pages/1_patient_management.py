@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 import os
 from datetime import datetime, timedelta
 import json
+from patient_session_manager import PatientSessionManager, SESSION_LOG_PATH
 
 # Helper functions
 def calculate_age(dob_str):
@@ -37,7 +38,6 @@ def calculate_days_since(date_str):
 
 # Initialize patient database
 PATIENT_DB_PATH = "patient_database.csv"
-SESSION_LOG_PATH = "session_log.csv"
 
 def load_patient_database():
     """Load patient database or create if it doesn't exist"""
@@ -389,7 +389,7 @@ with tab3:
                 full_name = f"{patient['FirstName']} {patient['LastName']}"
                 
                 if os.path.exists(SESSION_LOG_PATH):
-                    session_df = pd.read_csv(SESSION_LOG_PATH)
+                    session_df = PatientSessionManager.load_session_log(parse_dates=True)
                     patient_sessions = session_df[session_df['Athlete'] == full_name]
                     
                     if len(patient_sessions) > 0:
@@ -413,8 +413,6 @@ with tab3:
                         
                         # Progress chart
                         if len(patient_sessions) >= 2:
-                            patient_sessions['Date'] = pd.to_datetime(patient_sessions['Date'])
-                            
                             fig = go.Figure()
                             
                             # Add LSI line
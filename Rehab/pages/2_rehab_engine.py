@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import os
 import re 
 from datetime import datetime
-from patient_session_manager import PatientSessionManager
+from patient_session_manager import PatientSessionManager, SESSION_LOG_PATH
 from rehabilitation_logic import get_rehab_phase, get_exercise_recommendations, get_all_exercises_for_injury_phase
 
 # The rest uses the integrated version I provided
@@ -309,16 +308,12 @@ if st.button("📈 Calculate Rehab Phase", use_container_width=True):
                     }
                     
                     # Load existing session log or create new
-                    session_log_path = "session_log.csv"
-                    if os.path.exists(session_log_path):
-                        session_df = pd.read_csv(session_log_path)
-                    else:
-                        session_df = pd.DataFrame()
+                    session_df = PatientSessionManager.load_session_log()
                     
                     # Append new session
                     new_session = pd.DataFrame([session_data])
                     session_df = pd.concat([session_df, new_session], ignore_index=True)
-                    session_df.to_csv(session_log_path, index=False)
+                    session_df.to_csv(SESSION_LOG_PATH, index=False)
                     
                     st.success("✅ Session logged successfully!")
                     
@@ -327,16 +322,14 @@ if st.button("📈 Calculate Rehab Phase", use_container_width=True):
 
 # Show recent calculations if session log exists
 try:
-    session_log_path = "session_log.csv"
-    if os.path.exists(session_log_path):
-        session_df = pd.read_csv(session_log_path)
-        if len(session_df) > 0:
-            st.markdown("---")
-            st.subheader("🕒 Recent Calculations")
-            recent_sessions = session_df.tail(3)
-            st.dataframe(
-                recent_sessions[['Date', 'Athlete', 'Injury', 'Phase', 'Symmetry Index', 'Pain Score']],
-                use_container_width=True
-            )
+    session_df = PatientSessionManager.load_session_log()
+    if len(session_df) > 0:
+        st.markdown("---")
+        st.subheader("🕒 Recent Calculations")
+        recent_sessions = session_df.tail(3)
+        st.dataframe(
+            recent_sessions[['Date', 'Athlete', 'Injury', 'Phase', 'Symmetry Index', 'Pain Score']],
+            use_container_width=True
+        )
 except Exception:
     pass  # Ignore if file doesn't exist yet
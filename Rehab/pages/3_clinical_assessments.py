@@ -1,33 +1,130 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
 import json
+import importlib
 from patient_session_manager import PatientSessionManager
 
 patient_id = PatientSessionManager.create_patient_selector()
 if patient_id:
     patient = PatientSessionManager.get_current_patient()
     # Your page code with patient context
-# Import our new modules (you'll need to add these files to your project)
-try:
-    from outcome_measures import (
-        calculate_ikdc_score, calculate_koos_score, 
-        calculate_dash_score, calculate_nprs_score,
-        track_outcome_changes
-    )
-    from load_progression import (
-        calculate_1rm_estimate, calculate_training_loads,
-        calculate_rpe_loads, calculate_volume_progression,
-        generate_periodization_plan
-    )
-    from red_flag_detection import (
-        assess_red_flags, create_red_flag_screening_form
+
+def load_tab_module(name):
+    """Import the clinical module a tab needs, reporting it inside that tab if it is missing"""
+    # Each tab imports only its own module, so one missing file doesn't take down the page
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        st.error(f"⚠️ Clinical assessment module `{name}` not found. Please add the required Python file.")
+        return None
+
+# Cached wrappers: reruns with unchanged inputs reuse the previous result
+@st.cache_data(max_entries=256)
+def cached_ikdc_score(response_items):
+    """IKDC score for a sorted tuple of (question, response) pairs"""
+    from outcome_measures import calculate_ikdc_score
+    return calculate_ikdc_score(dict(response_items))
+
+@st.cache_data(max_entries=256)
+def cached_nprs_score(current_pain, worst_pain, least_pain, average_pain):
+    """Composite NPRS score"""
+    from outcome_measures import calculate_nprs_score
+    return calculate_nprs_score(current_pain, worst_pain, least_pain, average_pain)
+
+@st.cache_data(max_entries=256)
+def cached_1rm_estimate(weight, reps, formula):
+    """Estimated 1RM"""
+    from load_progression import calculate_1rm_estimate
+    return calculate_1rm_estimate(weight, reps, formula)
+
+# Goals listed under the 1RM estimate
+RM_GOALS = ("strength", "hypertrophy", "endurance")
+
+@st.cache_data(max_entries=256)
+def cached_goal_load_ranges(one_rm):
+    """% 1RM ranges and min/max training loads for every RM_GOALS entry, one row per goal"""
+    from load_progression import LOAD_PRESCRIPTIONS
+    intensities = np.array([LOAD_PRESCRIPTIONS[goal]['intensity_range'] for goal in RM_GOALS])
+    # Python's round keeps these identical to calculate_training_loads (np.round splits ties differently)
+    loads = [[round(load, 1) for load in row] for row in (one_rm * (intensities / 100)).tolist()]
+    return intensities.tolist(), loads
+
+@st.cache_data(max_entries=256)
+def cached_rpe_loads(current_weight, current_rpe, target_rpe, exercise_type):
+    """RPE-based load adjustment"""
+    from load_progression import calculate_rpe_loads
+    return calculate_rpe_loads(current_weight, current_rpe, target_rpe, exercise_type)
+
+# Red flag risk and recommendation priority icons
+RISK_COLORS = {
+    'EMERGENCY': '🔴',
+    'HIGH': '🟠',
+    'MODERATE': '🟡',
+    'LOW': '🟢',
+    'MINIMAL': '🔵'
+}
+
+PRIORITY_COLORS = {
+    'IMMEDIATE': '🔴',
+    'URGENT': '🟠',
+    'ROUTINE': '🟡',
+    'PREVENTIVE': '🔵'
+}
+
+# Extra screening questions per body region: heading and (screening_data key, label) pairs
+REGION_SCREENING_QUESTIONS = {
+    "knee": ("**Knee-Specific:**", (
+        ('joint_effusion', "Joint effusion with warmth"),
+        ('ottawa_knee_positive', "Ottawa Knee Rule positive"),
+        ('pulse_deficit', "Pulse deficit or cold limb")
+    ))
+}
+
+# Above this many red flags, list them in one table instead of one expander each
+RED_FLAG_EXPANDER_LIMIT = 5
+
+FLAG_COLUMNS = ['flag', 'severity', 'category', 'action', 'evidence']
+
+# Mock progress series for the tracking tab (in real app, load from database)
+MOCK_DATES = np.datetime64('2024-01-07') + np.arange(0, 84, 7)  # 12 weekly Sundays
+MOCK_IKDC_SCORES = np.array([45, 52, 58, 65, 72, 78, 82, 85, 88, 91, 93, 95])
+MOCK_PAIN_SCORES = np.array([8, 7, 6, 5, 4, 3, 3, 2, 2, 1, 1, 0])
+
+def summarize_progress(dates, ikdc_scores, pain_scores):
+    """IKDC change, pain reduction, weeks in program and current phase"""
+    return (
+        int(ikdc_scores[-1] - ikdc_scores[0]),
+        int(pain_scores[0] - pain_scores[-1]),
+        len(dates),
+        "Return to Sport" if ikdc_scores[-1] >= 90 else "Late Phase"
     )
-except ImportError:
-    st.error("⚠️ Clinical assessment modules not found. Please add the required Python files.")
-    st.stop()
+
+MOCK_SUMMARY = summarize_progress(MOCK_DATES, MOCK_IKDC_SCORES, MOCK_PAIN_SCORES)
+
+# Static evidence summary shown below the tabs
+EVIDENCE_FEATURES_MARKDOWN = """
+---
+### 📚 **Evidence-Based Features:**
+
+**🩺 Outcome Measures:**
+- IKDC: Validated for knee injuries (Irrgang et al., 2001)
+- KOOS: Comprehensive knee assessment (Roos et al., 1998)
+- DASH: Upper extremity function (Hudak et al., 1996)
+- NPRS: Gold standard pain assessment (Jensen et al., 2003)
+
+**💪 Load Progression:**
+- 1RM estimation using validated formulas
+- Evidence-based intensity prescriptions (ACSM Guidelines)
+- RPE-based auto-regulation (Zourdos et al., 2016)
+
+**⚠️ Red Flag Screening:**
+- Based on clinical practice guidelines
+- Systematic approach to serious pathology detection
+- Evidence from emergency medicine and orthopedics
+
+All tools include **Minimal Clinically Important Differences (MCID)** for meaningful change detection.
+"""
 
 st.title("📊 Clinical Assessments & Progression")
 st.markdown("Evidence-based tools for comprehensive patient assessment and exercise prescription")
@@ -38,332 +135,311 @@ tab1, tab2, tab3, tab4 = st.tabs([
     "💪 Load Progression", 
     "⚠️ Red Flag Screening",
     "📈 Progress Tracking"
-])
+], key="assessment_tab", on_change="rerun")
 
-# Tab 1: Outcome Measures
+# Tab 1: Outcome Measures (only runs while the tab is open)
 with tab1:
-    st.header("📋 Validated Outcome Measures")
-    st.markdown("*Use scientifically validated tools to track patient progress*")
+    if tab1.open and load_tab_module("outcome_measures"):
+        st.header("📋 Validated Outcome Measures")
+        st.markdown("*Use scientifically validated tools to track patient progress*")
     
-    # Assessment type selection
-    assessment_type = st.selectbox(
-        "Select Assessment Tool:",
-        ["IKDC (Knee)", "KOOS (Knee)", "DASH (Upper Extremity)", "NPRS (Pain)"]
-    )
+        # Assessment type selection
+        assessment_type = st.selectbox(
+            "Select Assessment Tool:",
+            ["IKDC (Knee)", "KOOS (Knee)", "DASH (Upper Extremity)", "NPRS (Pain)"]
+        )
     
-    if assessment_type == "IKDC (Knee)":  # This line was incorrectly indented
-        st.subheader("🦵 IKDC Knee Assessment")
-        st.caption("International Knee Documentation Committee - Validated for knee injuries")
+        if assessment_type == "IKDC (Knee)":  # This line was incorrectly indented
+            st.subheader("🦵 IKDC Knee Assessment")
+            st.caption("International Knee Documentation Committee - Validated for knee injuries")
         
-        with st.form("ikdc_form"):
-            col1, col2 = st.columns(2)
+            with st.form("ikdc_form"):
+                col1, col2 = st.columns(2)
             
-            with col1:
-                pain_level = st.slider("Pain Level (0=severe, 10=none)", 0, 10, 5)
-                swelling = st.slider("Swelling (0=severe, 4=none)", 0, 4, 2)
-                locking = st.slider("Locking Episodes (0=constant, 4=never)", 0, 4, 2)
-                instability = st.slider("Giving Way (0=constant, 4=never)", 0, 4, 2)
+                with col1:
+                    pain_level = st.slider("Pain Level (0=severe, 10=none)", 0, 10, 5)
+                    swelling = st.slider("Swelling (0=severe, 4=none)", 0, 4, 2)
+                    locking = st.slider("Locking Episodes (0=constant, 4=never)", 0, 4, 2)
+                    instability = st.slider("Giving Way (0=constant, 4=never)", 0, 4, 2)
             
-            with col2:
-                activity_level = st.slider("Activity Level (0=unable, 4=normal)", 0, 4, 2)
-                function_score = st.slider("Function (0=cannot do, 4=no difficulty)", 0, 4, 2)
-                sports_participation = st.slider("Sports (0=unable, 4=normal)", 0, 4, 2)
+                with col2:
+                    activity_level = st.slider("Activity Level (0=unable, 4=normal)", 0, 4, 2)
+                    function_score = st.slider("Function (0=cannot do, 4=no difficulty)", 0, 4, 2)
+                    sports_participation = st.slider("Sports (0=unable, 4=normal)", 0, 4, 2)
             
-            # Option to save automatically
-            auto_save = st.checkbox("Auto-save assessment after calculation", value=True)
+                # Option to save automatically
+                auto_save = st.checkbox("Auto-save assessment after calculation", value=True)
             
-            # Single submit button that both calculates AND saves
-            submitted = st.form_submit_button("💾 Calculate & Save IKDC Score")
+                # Single submit button that both calculates AND saves
+                submitted = st.form_submit_button("💾 Calculate & Save IKDC Score")
             
-            if submitted:
-                responses = {
-                    'pain_level': pain_level,
-                    'swelling': swelling,
-                    'locking': locking,
-                    'instability': instability,
-                    'activity_level': activity_level,
-                    'function_score': function_score,
-                    'sports_participation': sports_participation
-                }
+                if submitted:
+                    responses = {
+                        'pain_level': pain_level,
+                        'swelling': swelling,
+                        'locking': locking,
+                        'instability': instability,
+                        'activity_level': activity_level,
+                        'function_score': function_score,
+                        'sports_participation': sports_participation
+                    }
                 
-                result = calculate_ikdc_score(responses)
+                    result = cached_ikdc_score(tuple(sorted(responses.items())))
                 
-                # Display results
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("IKDC Score", f"{result['score']}", f"MCID: {result['mcid']}")
-                with col2:
-                    st.metric("Risk Level", result['risk_level'])
-                with col3:
-                    st.metric("Interpretation", result['interpretation'])
+                    # Display results
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("IKDC Score", f"{result['score']}", f"MCID: {result['mcid']}")
+                    with col2:
+                        st.metric("Risk Level", result['risk_level'])
+                    with col3:
+                        st.metric("Interpretation", result['interpretation'])
                 
-                st.info(f"**Recommendation:** {result['recommendation']}")
+                    st.info(f"**Recommendation:** {result['recommendation']}")
                 
-                # Save the assessment if auto_save is enabled
-                if auto_save:
-                    # Add your save logic here
-                    # For example:
-                    # save_to_database(result)
-                    # save_to_csv(result)
-                    st.success("✅ Assessment calculated and saved successfully!")
-                else:
-                    st.success("✅ Assessment calculated successfully!")
+                    # Save the assessment if auto_save is enabled
+                    if auto_save:
+                        # Add your save logic here
+                        # For example:
+                        # save_to_database(result)
+                        # save_to_csv(result)
+                        st.success("✅ Assessment calculated and saved successfully!")
+                    else:
+                        st.success("✅ Assessment calculated successfully!")
 
-    elif assessment_type == "NPRS (Pain)":
-        st.subheader("😖 Numeric Pain Rating Scale")
-        st.caption("Validated pain assessment tool")
+        elif assessment_type == "NPRS (Pain)":
+            st.subheader("😖 Numeric Pain Rating Scale")
+            st.caption("Validated pain assessment tool")
         
-        with st.form("nprs_form"):
-            col1, col2 = st.columns(2)
+            with st.form("nprs_form"):
+                col1, col2 = st.columns(2)
             
-            with col1:
-                current_pain = st.slider("Current Pain (0-10)", 0, 10, 0)
-                worst_pain = st.slider("Worst Pain (24hrs)", 0, 10, 0)
+                with col1:
+                    current_pain = st.slider("Current Pain (0-10)", 0, 10, 0)
+                    worst_pain = st.slider("Worst Pain (24hrs)", 0, 10, 0)
             
-            with col2:
-                least_pain = st.slider("Least Pain (24hrs)", 0, 10, 0)
-                average_pain = st.slider("Average Pain (24hrs)", 0, 10, 0)
+                with col2:
+                    least_pain = st.slider("Least Pain (24hrs)", 0, 10, 0)
+                    average_pain = st.slider("Average Pain (24hrs)", 0, 10, 0)
             
-            submitted = st.form_submit_button("Calculate Pain Score")
+                submitted = st.form_submit_button("Calculate Pain Score")
             
-            if submitted:
-                result = calculate_nprs_score(current_pain, worst_pain, least_pain, average_pain)
+                if submitted:
+                    result = cached_nprs_score(current_pain, worst_pain, least_pain, average_pain)
                 
-                if 'error' not in result:
-                    st.metric("Composite Pain Score", f"{result['composite_score']}/10")
+                    if 'error' not in result:
+                        st.metric("Composite Pain Score", f"{result['composite_score']}/10")
                     
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(f"**Interpretation:** {result['interpretation']}")
-                        st.write(f"**Functional Impact:** {result['functional_impact']}")
-                    with col2:
-                        st.write(f"**Recommendation:** {result['recommendation']}")
-                        st.caption(f"MCID: {result['mcid']} points")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.write(f"**Interpretation:** {result['interpretation']}")
+                            st.write(f"**Functional Impact:** {result['functional_impact']}")
+                        with col2:
+                            st.write(f"**Recommendation:** {result['recommendation']}")
+                            st.caption(f"MCID: {result['mcid']} points")
 
-# Tab 2: Load Progression
+# Tab 2: Load Progression (only runs while the tab is open)
 with tab2:
-    st.header("💪 Exercise Load Progression")
-    st.markdown("*Scientific methods for progressing exercise intensity and volume*")
+    if tab2.open and load_tab_module("load_progression"):
+        st.header("💪 Exercise Load Progression")
+        st.markdown("*Scientific methods for progressing exercise intensity and volume*")
     
-    progression_type = st.selectbox(
-        "Select Progression Tool:",
-        ["1RM Estimation", "Training Load Calculator", "RPE-Based Loading", "Volume Progression"]
-    )
+        progression_type = st.selectbox(
+            "Select Progression Tool:",
+            ["1RM Estimation", "Training Load Calculator", "RPE-Based Loading", "Volume Progression"]
+        )
     
-    if progression_type == "1RM Estimation":
-        st.subheader("🏋️ One Rep Max Estimation")
-        st.caption("Estimate 1RM using validated formulas")
+        if progression_type == "1RM Estimation":
+            st.subheader("🏋️ One Rep Max Estimation")
+            st.caption("Estimate 1RM using validated formulas")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            weight = st.number_input("Weight Lifted (lbs/kg)", 0.0, 1000.0, 100.0)
-            reps = st.number_input("Reps Completed", 1, 20, 5)
-            formula = st.selectbox("Formula", ["epley", "brzycki", "lander"])
+            with col1:
+                weight = st.number_input("Weight Lifted (lbs/kg)", 0.0, 1000.0, 100.0)
+                reps = st.number_input("Reps Completed", 1, 20, 5)
+                formula = st.selectbox("Formula", ["epley", "brzycki", "lander"])
         
-        with col2:
-            if weight > 0 and reps > 0:
-                estimated_1rm = calculate_1rm_estimate(weight, reps, formula)
-                st.metric("Estimated 1RM", f"{estimated_1rm}")
+            with col2:
+                if weight > 0 and reps > 0:
+                    estimated_1rm = cached_1rm_estimate(weight, reps, formula)
+                    st.metric("Estimated 1RM", f"{estimated_1rm}")
                 
-                # Show training loads
-                st.write("**Training Load Recommendations:**")
-                for goal in ["strength", "hypertrophy", "endurance"]:
-                    loads = calculate_training_loads(estimated_1rm, goal)
-                    min_load, max_load = loads['load_range']
-                    st.write(f"• **{goal.title()}:** {min_load}-{max_load} ({loads['intensity_percent'][0]}-{loads['intensity_percent'][1]}%)")
-
-    elif progression_type == "RPE-Based Loading":
-        st.subheader("📊 RPE-Based Load Adjustment")
-        st.caption("Adjust loads based on Rate of Perceived Exertion")
+                    # Show training loads
+                    st.write("**Training Load Recommendations:**")
+                    intensity_ranges, load_ranges = cached_goal_load_ranges(estimated_1rm)
+                    st.markdown("\n".join(
+                        f"• **{goal.title()}:** {min_load}-{max_load} ({min_pct}-{max_pct}%)  "
+                        for goal, (min_load, max_load), (min_pct, max_pct)
+                        in zip(RM_GOALS, load_ranges, intensity_ranges)
+                    ))
+
+        elif progression_type == "RPE-Based Loading":
+            st.subheader("📊 RPE-Based Load Adjustment")
+            st.caption("Adjust loads based on Rate of Perceived Exertion")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            current_weight = st.number_input("Current Weight", 0.0, 1000.0, 100.0)
-            current_rpe = st.selectbox("Current RPE", [5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10])
-            target_rpe = st.selectbox("Target RPE", [5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10])
-            exercise_type = st.selectbox("Exercise Type", ["compound", "isolation", "unilateral", "functional"])
+            with col1:
+                current_weight = st.number_input("Current Weight", 0.0, 1000.0, 100.0)
+                current_rpe = st.selectbox("Current RPE", [5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10])
+                target_rpe = st.selectbox("Target RPE", [5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5, 9, 9.5, 10])
+                exercise_type = st.selectbox("Exercise Type", ["compound", "isolation", "unilateral", "functional"])
         
-        with col2:
-            if current_weight > 0:
-                rpe_result = calculate_rpe_loads(current_weight, current_rpe, target_rpe, exercise_type)
+            with col2:
+                if current_weight > 0:
+                    rpe_result = cached_rpe_loads(current_weight, current_rpe, target_rpe, exercise_type)
                 
-                st.metric("Recommended Weight", f"{rpe_result['recommended_weight']}")
-                st.metric("Estimated 1RM", f"{rpe_result['estimated_1rm']}")
-                st.write(f"**Change:** {rpe_result['percentage_change']:+.1f}%")
-                st.info(rpe_result['progression_notes'])
+                    st.metric("Recommended Weight", f"{rpe_result['recommended_weight']}")
+                    st.metric("Estimated 1RM", f"{rpe_result['estimated_1rm']}")
+                    st.write(f"**Change:** {rpe_result['percentage_change']:+.1f}%")
+                    st.info(rpe_result['progression_notes'])
 
-# Tab 3: Red Flag Screening
+# Tab 3: Red Flag Screening (only runs while the tab is open)
 with tab3:
-    st.header("⚠️ Red Flag Screening")
-    st.markdown("*Systematic screening for serious pathology requiring medical referral*")
+    if tab3.open and load_tab_module("red_flag_detection"):
+        st.header("⚠️ Red Flag Screening")
+        st.markdown("*Systematic screening for serious pathology requiring medical referral*")
     
-    st.warning("**Important:** This is a screening tool only. Clinical judgment is always required.")
+        st.warning("**Important:** This is a screening tool only. Clinical judgment is always required.")
     
-    # Patient information
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        age = st.number_input("Patient Age", 0, 120, 30)
-        region = st.selectbox("Body Region", ["spine", "knee", "shoulder", "ankle", "general"])
-    
-    with col2:
-        onset = st.selectbox("Pain Onset", ["acute", "gradual", "chronic"])
-        trauma_history = st.checkbox("History of significant trauma")
-    
-    # Systematic screening questions
-    st.subheader("🔍 Systematic Screening")
-    
-    screening_data = {'age': age, 'region': region}
-    
-    # Constitutional symptoms
-    st.write("**Constitutional Symptoms:**")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        screening_data['fever'] = st.checkbox("Fever")
-        screening_data['unexplained_weight_loss'] = st.checkbox("Weight loss >10lbs")
-        screening_data['night_sweats'] = st.checkbox("Night sweats")
-    
-    with col2:
-        screening_data['constant_progressive_pain'] = st.checkbox("Constant, progressive pain")
-        screening_data['night_pain_no_relief'] = st.checkbox("Severe night pain")
-        screening_data['new_onset_pain'] = st.checkbox("New onset pain") if age > 50 else False
+        # Patient information (age and region decide which questions are asked, so they sit outside the form)
+        col1, col2 = st.columns(2)
     
-    with col3:
-        screening_data['significant_trauma'] = trauma_history
-        screening_data['progressive_weakness'] = st.checkbox("Progressive weakness")
-        screening_data['bladder_dysfunction'] = st.checkbox("Bladder dysfunction")
+        with col1:
+            age = st.number_input("Patient Age", 0, 120, 30)
     
-    # Region-specific questions
-    if region == "knee":
-        st.write("**Knee-Specific:**")
-        screening_data['joint_effusion'] = st.checkbox("Joint effusion with warmth")
-        screening_data['ottawa_knee_positive'] = st.checkbox("Ottawa Knee Rule positive")
-        screening_data['pulse_deficit'] = st.checkbox("Pulse deficit or cold limb")
+        with col2:
+            region = st.selectbox("Body Region", ["spine", "knee", "shoulder", "ankle", "general"])
     
-    # Assessment
-    if st.button("🔍 Assess Red Flags"):
-        assessment = assess_red_flags(screening_data)
+        # Checkbox answers are batched into one rerun on submit
+        with st.form("red_flag_form"):
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                onset = st.selectbox("Pain Onset", ["acute", "gradual", "chronic"])
+        
+            with col2:
+                trauma_history = st.checkbox("History of significant trauma")
         
-        # Display risk level with color coding
-        risk_colors = {
-            'EMERGENCY': '🔴',
-            'HIGH': '🟠', 
-            'MODERATE': '🟡',
-            'LOW': '🟢',
-            'MINIMAL': '🔵'
-        }
+            # Systematic screening questions
+            st.subheader("🔍 Systematic Screening")
         
-        risk_icon = risk_colors.get(assessment['risk_level'], '⚪')
-        st.subheader(f"{risk_icon} Risk Level: {assessment['risk_level']}")
+            screening_data = {'age': age, 'region': region}
         
-        # Show red flags
-        if assessment['red_flags']:
-            st.error("🚨 **RED FLAGS IDENTIFIED:**")
-            for flag in assessment['red_flags']:
-                with st.expander(f"⚠️ {flag['flag']} ({flag['severity']})"):
-                    st.write(f"**Category:** {flag['category']}")
-                    st.write(f"**Action Required:** {flag['action']}")
-                    st.write(f"**Evidence:** {flag['evidence']}")
+            # Constitutional symptoms
+            st.write("**Constitutional Symptoms:**")
+            col1, col2, col3 = st.columns(3)
         
-        # Show recommendations
-        st.subheader("📋 Recommendations")
-        for rec in assessment['recommendations']:
-            priority_colors = {
-                'IMMEDIATE': '🔴',
-                'URGENT': '🟠',
-                'ROUTINE': '🟡',
-                'PREVENTIVE': '🔵'
-            }
-            
-            icon = priority_colors.get(rec['priority'], '📝')
-            st.write(f"{icon} **{rec['priority']}:** {rec['action']} ({rec['timeframe']})")
-            st.caption(f"Rationale: {rec['rationale']}")
+            with col1:
+                screening_data['fever'] = st.checkbox("Fever")
+                screening_data['unexplained_weight_loss'] = st.checkbox("Weight loss >10lbs")
+                screening_data['night_sweats'] = st.checkbox("Night sweats")
+        
+            with col2:
+                screening_data['constant_progressive_pain'] = st.checkbox("Constant, progressive pain")
+                screening_data['night_pain_no_relief'] = st.checkbox("Severe night pain")
+                screening_data['new_onset_pain'] = st.checkbox("New onset pain") if age > 50 else False
+        
+            with col3:
+                screening_data['significant_trauma'] = trauma_history
+                screening_data['progressive_weakness'] = st.checkbox("Progressive weakness")
+                screening_data['bladder_dysfunction'] = st.checkbox("Bladder dysfunction")
+        
+            # Region-specific questions
+            if region in REGION_SCREENING_QUESTIONS:
+                heading, questions = REGION_SCREENING_QUESTIONS[region]
+                st.write(heading)
+                for key, label in questions:
+                    screening_data[key] = st.checkbox(label)
+        
+            submitted = st.form_submit_button("🔍 Assess Red Flags")
+    
+        # Assessment
+        if submitted:
+            from red_flag_detection import assess_red_flags
+            assessment = assess_red_flags(screening_data)
+        
+            # Display risk level with color coding
+            risk_icon = RISK_COLORS.get(assessment['risk_level'], '⚪')
+            st.subheader(f"{risk_icon} Risk Level: {assessment['risk_level']}")
+        
+            # Show red flags
+            if assessment['red_flags']:
+                st.error("🚨 **RED FLAGS IDENTIFIED:**")
+                if len(assessment['red_flags']) > RED_FLAG_EXPANDER_LIMIT:
+                    st.dataframe(assessment['red_flags'], column_order=FLAG_COLUMNS,
+                                 use_container_width=True, hide_index=True)
+                else:
+                    for flag in assessment['red_flags']:
+                        with st.expander(f"⚠️ {flag['flag']} ({flag['severity']})"):
+                            st.write(f"**Category:** {flag['category']}")
+                            st.write(f"**Action Required:** {flag['action']}")
+                            st.write(f"**Evidence:** {flag['evidence']}")
+        
+            # Show recommendations
+            st.subheader("📋 Recommendations")
+            # One markdown block instead of a write + caption per recommendation
+            st.markdown("\n\n".join(
+                f"{PRIORITY_COLORS.get(rec['priority'], '📝')} **{rec['priority']}:** {rec['action']} ({rec['timeframe']})  \n"
+                f":gray[Rationale: {rec['rationale']}]"
+                for rec in assessment['recommendations']
+            ))
 
-# Tab 4: Progress Tracking
+# Tab 4: Progress Tracking (only runs while the tab is open)
 with tab4:
-    st.header("📈 Progress Tracking Dashboard")
-    st.markdown("*Track outcome measures and exercise progression over time*")
-    
-    # Mock data for demonstration (in real app, load from database)
-    dates = pd.date_range(start='2024-01-01', periods=12, freq='W')
+    if tab4.open:
+        # Plotly is only needed here, so load it on demand
+        import plotly.graph_objects as go
+
+        st.header("📈 Progress Tracking Dashboard")
+        st.markdown("*Track outcome measures and exercise progression over time*")
     
-    # Sample IKDC scores over time
-    ikdc_scores = [45, 52, 58, 65, 72, 78, 82, 85, 88, 91, 93, 95]
-    pain_scores = [8, 7, 6, 5, 4, 3, 3, 2, 2, 1, 1, 0]
+        # Mock data for demonstration
+        dates = MOCK_DATES
+        ikdc_scores = MOCK_IKDC_SCORES
+        pain_scores = MOCK_PAIN_SCORES
+        ikdc_change, pain_change, weeks_progress, current_phase = MOCK_SUMMARY
     
-    # Create progress charts
-    col1, col2 = st.columns(2)
+        # Create progress charts
+        col1, col2 = st.columns(2)
     
-    with col1:
-        # IKDC Progress
-        fig_ikdc = px.line(
-            x=dates, y=ikdc_scores,
-            title="IKDC Score Progress",
-            labels={'x': 'Date', 'y': 'IKDC Score'}
-        )
-        fig_ikdc.add_hline(y=90, line_dash="dash", line_color="green", 
-                          annotation_text="Return to Sport Threshold")
-        fig_ikdc.add_hline(y=60, line_dash="dash", line_color="orange",
-                          annotation_text="Fair Function")
-        st.plotly_chart(fig_ikdc, use_container_width=True)
+        with col1:
+            # IKDC Progress
+            fig_ikdc = go.Figure(go.Scatter(x=dates, y=ikdc_scores, mode='lines+markers', name='IKDC'))
+            fig_ikdc.update_layout(title="IKDC Score Progress", xaxis_title='Date', yaxis_title='IKDC Score')
+            fig_ikdc.add_hline(y=90, line_dash="dash", line_color="green", 
+                              annotation_text="Return to Sport Threshold")
+            fig_ikdc.add_hline(y=60, line_dash="dash", line_color="orange",
+                              annotation_text="Fair Function")
+            st.plotly_chart(fig_ikdc, use_container_width=True)
     
-    with col2:
-        # Pain Progress
-        fig_pain = px.line(
-            x=dates, y=pain_scores,
-            title="Pain Score Progress (NPRS)",
-            labels={'x': 'Date', 'y': 'Pain Score (0-10)'}
-        )
-        fig_pain.add_hline(y=3, line_dash="dash", line_color="green",
-                          annotation_text="Mild Pain Threshold")
-        st.plotly_chart(fig_pain, use_container_width=True)
+        with col2:
+            # Pain Progress
+            fig_pain = go.Figure(go.Scatter(x=dates, y=pain_scores, mode='lines+markers', name='NPRS'))
+            fig_pain.update_layout(title="Pain Score Progress (NPRS)", xaxis_title='Date', yaxis_title='Pain Score (0-10)')
+            fig_pain.add_hline(y=3, line_dash="dash", line_color="green",
+                              annotation_text="Mild Pain Threshold")
+            st.plotly_chart(fig_pain, use_container_width=True)
     
-    # Progress summary
-    st.subheader("📊 Progress Summary")
+        # Progress summary
+        st.subheader("📊 Progress Summary")
     
-    col1, col2, col3, col4 = st.columns(4)
+        col1, col2, col3, col4 = st.columns(4)
     
-    with col1:
-        ikdc_change = ikdc_scores[-1] - ikdc_scores[0]
-        st.metric("IKDC Change", f"+{ikdc_change}", f"+{ikdc_change} points")
+        with col1:
+            st.metric("IKDC Change", f"+{ikdc_change}", f"+{ikdc_change} points")
     
-    with col2:
-        pain_change = pain_scores[0] - pain_scores[-1]
-        st.metric("Pain Reduction", f"-{pain_change}", f"-{pain_change} points")
+        with col2:
+            st.metric("Pain Reduction", f"-{pain_change}", f"-{pain_change} points")
     
-    with col3:
-        weeks_progress = len(dates)
-        st.metric("Weeks in Program", weeks_progress)
+        with col3:
+            st.metric("Weeks in Program", weeks_progress)
     
-    with col4:
-        current_phase = "Return to Sport" if ikdc_scores[-1] >= 90 else "Late Phase"
-        st.metric("Current Phase", current_phase)
+        with col4:
+            st.metric("Current Phase", current_phase)
 
 # Add instructions at the bottom
-st.markdown("---")
-st.markdown("""
-### 📚 **Evidence-Based Features:**
-
-**🩺 Outcome Measures:**
-- IKDC: Validated for knee injuries (Irrgang et al., 2001)
-- KOOS: Comprehensive knee assessment (Roos et al., 1998)
-- DASH: Upper extremity function (Hudak et al., 1996)
-- NPRS: Gold standard pain assessment (Jensen et al., 2003)
-
-**💪 Load Progression:**
-- 1RM estimation using validated formulas
-- Evidence-based intensity prescriptions (ACSM Guidelines)
-- RPE-based auto-regulation (Zourdos et al., 2016)
-
-**⚠️ Red Flag Screening:**
-- Based on clinical practice guidelines
-- Systematic approach to serious pathology detection
-- Evidence from emergency medicine and orthopedics
-
-All tools include **Minimal Clinically Important Differences (MCID)** for meaningful change detection.
-""")
+st.markdown(EVIDENCE_FEATURES_MARKDOWN)
 
 st.info("💡 **Next Steps:** These assessments integrate with your existing rehab engine and patient dashboard for comprehensive care.")
@@ -1,36 +1,155 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
-import json
+from types import SimpleNamespace
 from patient_session_manager import PatientSessionManager
 
 patient_id = PatientSessionManager.create_patient_selector()
 if patient_id:
     patient = PatientSessionManager.get_current_patient()
     # Your page code with patient context
-# Import Phase 2 modules
-try:
+# Import Phase 2 modules once per server process instead of on every rerun
+@st.cache_resource
+def load_phase2_modules():
+    """Phase 2 clinical functions used by this page"""
     from rts_testing import (
         calculate_hop_test_battery, calculate_strength_testing_battery,
         calculate_agility_testing_battery, comprehensive_rts_assessment
     )
-    from recovery_predictions import (
-        predict_recovery_timeline, generate_timeline_recommendations,
-        track_recovery_progress
-    )
-    from contraindication_checker import (
-        check_exercise_contraindications, create_safety_checklist,
-        monitor_exercise_response
-    )
-    from treatment_plan_templates import (
-        generate_treatment_plan, export_treatment_plan
+    from recovery_predictions import predict_recovery_timeline, generate_timeline_recommendations
+    from contraindication_checker import check_exercise_contraindications
+    from treatment_plan_templates import generate_treatment_plan, export_treatment_plan
+    return SimpleNamespace(
+        calculate_hop_test_battery=calculate_hop_test_battery,
+        calculate_strength_testing_battery=calculate_strength_testing_battery,
+        calculate_agility_testing_battery=calculate_agility_testing_battery,
+        comprehensive_rts_assessment=comprehensive_rts_assessment,
+        predict_recovery_timeline=predict_recovery_timeline,
+        generate_timeline_recommendations=generate_timeline_recommendations,
+        check_exercise_contraindications=check_exercise_contraindications,
+        generate_treatment_plan=generate_treatment_plan,
+        export_treatment_plan=export_treatment_plan
     )
+
+try:
+    phase2 = load_phase2_modules()
 except ImportError:
     st.error("⚠️ Phase 2 modules not found. Please add the required Python files.")
     st.stop()
 
+# Mock agility data for demo
+AGILITY_DATA = {"t_test": 9.8, "gender": "male"}
+
+# Cached assessments: resubmitting unchanged inputs reuses the previous result
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_rts_assessment(hop_data, strength_data, psychological_data, injury_history,
+                          injury_type, sport_level, assessment_day):
+    """Hop, strength and comprehensive RTS results (assessment_day keeps report dates current)"""
+    hop_results = phase2.calculate_hop_test_battery(hop_data, injury_type, sport_level)
+    strength_results = phase2.calculate_strength_testing_battery(strength_data, injury_type)
+    agility_results = phase2.calculate_agility_testing_battery(AGILITY_DATA)
+    comprehensive_results = phase2.comprehensive_rts_assessment(
+        hop_results, strength_results, agility_results,
+        psychological_data, injury_history
+    )
+    return hop_results, strength_results, comprehensive_results
+
+def get_rts_assessment(hop_data, strength_data, psychological_data, injury_history, injury_type, sport_level):
+    """Reuse the last RTS result from session state when the submitted inputs are unchanged"""
+    assessment_day = datetime.now().date()
+    signature = (
+        tuple(hop_data.items()), tuple(strength_data.items()),
+        tuple(psychological_data.items()), tuple(injury_history.items()),
+        injury_type, sport_level, assessment_day
+    )
+    cached = st.session_state.get('rts_assessment')
+    if cached is None or cached[0] != signature:
+        st.session_state.rts_assessment = (signature, cached_rts_assessment(
+            hop_data, strength_data, psychological_data, injury_history,
+            injury_type, sport_level, assessment_day
+        ))
+    return st.session_state.rts_assessment[1]
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_recovery_prediction(injury_data, patient_factors, treatment_factors):
+    """Recovery timeline prediction and its optimization recommendations"""
+    prediction = phase2.predict_recovery_timeline(injury_data, patient_factors, treatment_factors)
+    return prediction, phase2.generate_timeline_recommendations(prediction)
+
+def display_name(key):
+    """Title-case label for a snake_case phase, factor or milestone key"""
+    return key.replace("_", " ").title()
+
+# Result, recommendation priority and safety level icons
+RESULT_COLORS = {"green": "🟢", "yellow": "🟡", "orange": "🟠", "red": "🔴"}
+
+PRIORITY_COLORS = {"High": "🔴", "Medium": "🟡", "Low": "🔵"}
+
+SAFETY_ICONS = {
+    "SAFE": "🟢",
+    "LOW_RISK": "🟡",
+    "MODERATE_RISK": "🟠",
+    "HIGH_RISK": "🔴",
+    "UNSAFE": "⛔"
+}
+
+# Static chart layouts; the 85-point target line is prebuilt rather than laid out by add_hline on every render
+COMPONENT_CHART_LAYOUT = {
+    "title": {"text": "Component Score Breakdown"},
+    "xaxis": {"title": {"text": "Assessment Area"}},
+    "yaxis": {"title": {"text": "Score (0-100)"}},
+    "shapes": [{"type": "line", "xref": "x domain", "x0": 0, "x1": 1, "yref": "y", "y0": 85, "y1": 85,
+                "line": {"color": "green", "dash": "dash"}}],
+    "annotations": [{"text": "Target (85)", "showarrow": False, "xref": "x domain", "x": 1, "xanchor": "right",
+                     "yref": "y", "y": 85, "yanchor": "bottom"}]
+}
+
+PHASE_CHART_LAYOUT = {
+    "title": {"text": "Recovery Phase Timeline"},
+    "xaxis": {"title": {"text": "Weeks from Injury"}},
+    "yaxis": {"title": {"text": "Phase"}}
+}
+
+# Contraindication category -> (banner, banner text, item icon, title key, detail rows)
+CONTRAINDICATION_SECTIONS = {
+    "absolute": (st.error, "🚨 **ABSOLUTE CONTRAINDICATIONS**", "⛔", "contraindication",
+                 [("Category", "category"), ("Action Required", "action"), ("Evidence", "evidence")]),
+    "relative": (st.warning, "⚠️ **RELATIVE CONTRAINDICATIONS**", "⚠️", "contraindication",
+                 [("Recommendation", "recommendation"), ("Evidence", "evidence")]),
+    "precautions": (st.info, "ℹ️ **EXERCISE PRECAUTIONS**", "⚠️", "precaution",
+                    [("Severity", "severity"), ("Recommendation", "recommendation"), ("Alternative", "alternative")]),
+}
+
+# Hop and strength inputs start from session state rather than per-widget default values
+RTS_INPUT_DEFAULTS = dict.fromkeys([
+    "single_injured", "triple_injured", "cross_injured", "timed_injured",
+    "single_uninjured", "triple_uninjured", "cross_uninjured", "timed_uninjured",
+    "ext_injured", "flex_injured", "ext_uninjured", "flex_uninjured"
+], 0.0)
+
+for key, value in RTS_INPUT_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+
+@st.fragment
+def render_export_options(treatment_plan):
+    """Export buttons for a generated plan, rerun on their own so a click keeps the plan on screen"""
+    st.subheader("📤 Export Options")
+    
+    export_col1, export_col2 = st.columns(2)
+    
+    with export_col1:
+        if st.button("📄 Export as PDF", use_container_width=True):
+            export_result = phase2.export_treatment_plan(treatment_plan, "pdf")
+            st.success(f"✅ Plan exported: {export_result['file_name']}")
+    
+    with export_col2:
+        if st.button("📊 Export as Excel", use_container_width=True):
+            export_result = phase2.export_treatment_plan(treatment_plan, "xlsx")
+            st.success(f"✅ Plan exported: {export_result['file_name']}")
+
+# Date defaults are fixed for the session so they (and the widgets keyed on them) don't shift at midnight
+session_today = st.session_state.setdefault('session_today', datetime.now().date())
+
 st.title("🏥 Clinical Game-Changers")
 st.markdown("**Phase 2:** Advanced clinical decision support tools for elite rehabilitation")
 
@@ -47,59 +166,52 @@ with tab1:
     st.header("🏃‍♂️ Return-to-Sport Testing Battery")
     st.markdown("*Evidence-based protocols for determining readiness to return to sport*")
     
-    # Patient and injury information
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📋 Patient Information")
-        patient_name = st.text_input("Patient Name")
-        injury_type = st.selectbox("Injury Type", ["ACL", "Achilles", "Hamstring", "MCL", "PCL"])
-        sport_level = st.selectbox("Sport Level", ["recreational", "competitive", "elite"])
-        months_post_injury = st.number_input("Months Post-Injury", 0, 24, 6)
-    
-    with col2:
-        st.subheader("🧠 Psychological Readiness")
-        confidence_score = st.slider("Confidence in Injured Limb (0-100)", 0, 100, 70)
-        fear_score = st.slider("Fear of Re-injury (0-100)", 0, 100, 30)
-        motivation_score = st.slider("Motivation to Return (0-100)", 0, 100, 80)
+    with st.form("rts_form"):
+        # Patient and injury information
+        col1, col2 = st.columns(2)
     
-    # Hop Testing Section
-    st.subheader("🦘 Hop Test Battery")
-    st.caption("Enter distances in centimeters or times in seconds")
-    
-    hop_col1, hop_col2 = st.columns(2)
+        with col1:
+            st.subheader("📋 Patient Information")
+            patient_name = st.text_input("Patient Name")
+            injury_type = st.selectbox("Injury Type", ["ACL", "Achilles", "Hamstring", "MCL", "PCL"])
+            sport_level = st.selectbox("Sport Level", ["recreational", "competitive", "elite"])
+            months_post_injury = st.number_input("Months Post-Injury", 0, 24, 6)
     
-    with hop_col1:
-        st.write("**Injured Limb Results:**")
-        single_hop_injured = st.number_input("Single Hop Distance (cm)", 0.0, 300.0, 0.0, key="single_injured")
-        triple_hop_injured = st.number_input("Triple Hop Distance (cm)", 0.0, 800.0, 0.0, key="triple_injured")
-        crossover_hop_injured = st.number_input("Crossover Hop Distance (cm)", 0.0, 800.0, 0.0, key="cross_injured")
-        timed_hop_injured = st.number_input("6m Timed Hop (seconds)", 0.0, 10.0, 0.0, key="timed_injured")
+        with col2:
+            st.subheader("🧠 Psychological Readiness")
+            confidence_score = st.slider("Confidence in Injured Limb (0-100)", 0, 100, 70)
+            fear_score = st.slider("Fear of Re-injury (0-100)", 0, 100, 30)
+            motivation_score = st.slider("Motivation to Return (0-100)", 0, 100, 80)
     
-    with hop_col2:
-        st.write("**Uninjured Limb Results:**")
-        single_hop_uninjured = st.number_input("Single Hop Distance (cm)", 0.0, 300.0, 0.0, key="single_uninjured")
-        triple_hop_uninjured = st.number_input("Triple Hop Distance (cm)", 0.0, 800.0, 0.0, key="triple_uninjured")
-        crossover_hop_uninjured = st.number_input("Crossover Hop Distance (cm)", 0.0, 800.0, 0.0, key="cross_uninjured")
-        timed_hop_uninjured = st.number_input("6m Timed Hop (seconds)", 0.0, 10.0, 0.0, key="timed_uninjured")
+        # Hop and strength testing share one injured/uninjured column pair
+        st.subheader("🦘 Hop & 💪 Strength Testing")
+        st.caption("Enter hop distances in centimeters, timed hops in seconds and strength in Nm")
     
-    # Strength Testing Section
-    st.subheader("💪 Strength Testing")
+        injured_col, uninjured_col = st.columns(2)
     
-    strength_col1, strength_col2 = st.columns(2)
+        with injured_col:
+            st.write("**Injured Limb Results:**")
+            single_hop_injured = st.number_input("Single Hop Distance (cm)", 0.0, 300.0, key="single_injured")
+            triple_hop_injured = st.number_input("Triple Hop Distance (cm)", 0.0, 800.0, key="triple_injured")
+            crossover_hop_injured = st.number_input("Crossover Hop Distance (cm)", 0.0, 800.0, key="cross_injured")
+            timed_hop_injured = st.number_input("6m Timed Hop (seconds)", 0.0, 10.0, key="timed_injured")
+            knee_ext_injured = st.number_input("Knee Extension (Nm)", 0.0, 500.0, key="ext_injured")
+            knee_flex_injured = st.number_input("Knee Flexion (Nm)", 0.0, 500.0, key="flex_injured")
     
-    with strength_col1:
-        st.write("**Injured Limb (Nm):**")
-        knee_ext_injured = st.number_input("Knee Extension", 0.0, 500.0, 0.0, key="ext_injured")
-        knee_flex_injured = st.number_input("Knee Flexion", 0.0, 500.0, 0.0, key="flex_injured")
+        with uninjured_col:
+            st.write("**Uninjured Limb Results:**")
+            single_hop_uninjured = st.number_input("Single Hop Distance (cm)", 0.0, 300.0, key="single_uninjured")
+            triple_hop_uninjured = st.number_input("Triple Hop Distance (cm)", 0.0, 800.0, key="triple_uninjured")
+            crossover_hop_uninjured = st.number_input("Crossover Hop Distance (cm)", 0.0, 800.0, key="cross_uninjured")
+            timed_hop_uninjured = st.number_input("6m Timed Hop (seconds)", 0.0, 10.0, key="timed_uninjured")
+            knee_ext_uninjured = st.number_input("Knee Extension (Nm)", 0.0, 500.0, key="ext_uninjured")
+            knee_flex_uninjured = st.number_input("Knee Flexion (Nm)", 0.0, 500.0, key="flex_uninjured")
     
-    with strength_col2:
-        st.write("**Uninjured Limb (Nm):**")
-        knee_ext_uninjured = st.number_input("Knee Extension", 0.0, 500.0, 0.0, key="ext_uninjured")
-        knee_flex_uninjured = st.number_input("Knee Flexion", 0.0, 500.0, 0.0, key="flex_uninjured")
+        # Calculate RTS Assessment
+        
+        submitted = st.form_submit_button("🎯 Calculate Return-to-Sport Readiness", use_container_width=True)
     
-    # Calculate RTS Assessment
-    if st.button("🎯 Calculate Return-to-Sport Readiness", use_container_width=True):
+    if submitted:
         # Prepare data
         hop_data = {
             "single_hop_injured": single_hop_injured,
@@ -131,98 +243,97 @@ with tab1:
             "rehab_compliance": 85
         }
         
-        # Calculate assessments
-        hop_results = calculate_hop_test_battery(hop_data, injury_type, sport_level)
-        strength_results = calculate_strength_testing_battery(strength_data, injury_type)
-        
-        # Mock agility data for demo
-        agility_data = {"t_test": 9.8, "gender": "male"}
-        agility_results = calculate_agility_testing_battery(agility_data)
-        
-        comprehensive_results = comprehensive_rts_assessment(
-            hop_results, strength_results, agility_results, 
-            psychological_data, injury_history
-        )
-        
-        # Display Results
-        st.markdown("---")
-        st.subheader("🎯 Return-to-Sport Assessment Results")
-        
-        # Overall Result with Color Coding
-        result_color = comprehensive_results["color"]
-        colors = {"green": "🟢", "yellow": "🟡", "orange": "🟠", "red": "🔴"}
-        color_icon = colors.get(result_color, "⚪")
-        
-        st.markdown(f"## {color_icon} **{comprehensive_results['rts_recommendation']}**")
-        st.markdown(f"**Risk Category:** {comprehensive_results['risk_category']}")
-        st.markdown(f"**Timeline:** {comprehensive_results['timeline']}")
-        
-        # Component Scores
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Composite Score", f"{comprehensive_results['composite_score']}/100")
-        with col2:
-            st.metric("Hop Test LSI", f"{hop_results['composite_lsi']}%")
-        with col3:
-            st.metric("Strength LSI", f"{strength_results['composite_strength_index']}%")
-        
-        # Detailed Component Analysis
-        fig = px.bar(
-            x=list(comprehensive_results['component_scores'].keys()),
-            y=list(comprehensive_results['component_scores'].values()),
-            title="Component Score Breakdown",
-            labels={'x': 'Assessment Area', 'y': 'Score (0-100)'}
-        )
-        fig.add_hline(y=85, line_dash="dash", line_color="green", annotation_text="Target (85)")
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Limiting Factors and Recommendations
-        if comprehensive_results['limiting_factors']:
-            st.subheader("⚠️ Limiting Factors")
-            for factor in comprehensive_results['limiting_factors']:
-                st.warning(f"• {factor}")
-        
-        st.subheader("📋 Specific Recommendations")
-        for rec in comprehensive_results['specific_recommendations']:
-            with st.expander(f"🎯 {rec['area']} - {rec['timeline']}"):
-                st.write(f"**Recommendation:** {rec['recommendation']}")
-                st.write(f"**Suggested Exercises:** {', '.join(rec['exercises'])}")
+        # Nothing to score until at least one hop and one strength result are entered
+        if not any(hop_data.values()) or not any(strength_data.values()):
+            st.info("Enter hop and strength measurements before calculating.")
+        else:
+            # Calculate assessments
+            hop_results, strength_results, comprehensive_results = get_rts_assessment(
+                hop_data, strength_data, psychological_data, injury_history,
+                injury_type, sport_level
+            )
+        
+            # Display Results
+            st.markdown("---")
+            st.subheader("🎯 Return-to-Sport Assessment Results")
+        
+            # Overall Result with Color Coding
+            result_color = comprehensive_results["color"]
+            color_icon = RESULT_COLORS.get(result_color, "⚪")
+        
+            st.markdown(f"## {color_icon} **{comprehensive_results['rts_recommendation']}**")
+            st.markdown(f"**Risk Category:** {comprehensive_results['risk_category']}")
+            st.markdown(f"**Timeline:** {comprehensive_results['timeline']}")
+        
+            # Component Scores
+            col1, col2, col3 = st.columns(3)
+        
+            with col1:
+                st.metric("Composite Score", f"{comprehensive_results['composite_score']}/100")
+            with col2:
+                st.metric("Hop Test LSI", f"{hop_results['composite_lsi']}%")
+            with col3:
+                st.metric("Strength LSI", f"{strength_results['composite_strength_index']}%")
+        
+            # Detailed Component Analysis (plotly is only loaded once results are shown)
+            import plotly.graph_objects as go
+            # A float array passes plotly's validation without an element-by-element list copy
+            component_scores = comprehensive_results['component_scores']
+            fig = go.Figure(go.Bar(
+                x=tuple(component_scores),
+                y=np.fromiter(component_scores.values(), dtype=np.float64, count=len(component_scores))
+            ), layout=COMPONENT_CHART_LAYOUT)
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Limiting Factors and Recommendations
+            if comprehensive_results['limiting_factors']:
+                st.subheader("⚠️ Limiting Factors")
+                for factor in comprehensive_results['limiting_factors']:
+                    st.warning(f"• {factor}")
+        
+            st.subheader("📋 Specific Recommendations")
+            for rec in comprehensive_results['specific_recommendations']:
+                with st.expander(f"🎯 {rec['area']} - {rec['timeline']}"):
+                    st.write(f"**Recommendation:** {rec['recommendation']}")
+                    st.write(f"**Suggested Exercises:** {', '.join(rec['exercises'])}")
 
 # Tab 2: Recovery Predictions
 with tab2:
     st.header("📅 Recovery Timeline Predictions")
     st.markdown("*Evidence-based predictions for rehabilitation timelines*")
     
-    # Input Section
-    col1, col2 = st.columns(2)
+    with st.form("recovery_form"):
+        # Input Section
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("🩺 Injury Information")
-        pred_injury_type = st.selectbox("Injury Type", ["ACL", "Achilles", "Hamstring", "Meniscus", "Rotator_Cuff"], key="pred_injury")
-        injury_severity = st.selectbox("Severity/Grade", ["conservative", "surgical", "grade_1", "grade_2", "grade_3"])
-        injury_date = st.date_input("Date of Injury", datetime.now() - timedelta(days=30))
-        
-    with col2:
-        st.subheader("👤 Patient Factors")
-        pred_age = st.number_input("Age", 15, 80, 30, key="pred_age")
-        fitness_level = st.selectbox("Pre-injury Fitness", ["elite", "high", "average", "low", "sedentary"])
-        compliance = st.selectbox("Expected Compliance", ["excellent", "good", "fair", "poor"])
-        
-    # Additional Factors
-    st.subheader("🔍 Additional Factors")
+        with col1:
+            st.subheader("🩺 Injury Information")
+            pred_injury_type = st.selectbox("Injury Type", ["ACL", "Achilles", "Hamstring", "Meniscus", "Rotator_Cuff"], key="pred_injury")
+            injury_severity = st.selectbox("Severity/Grade", ["conservative", "surgical", "grade_1", "grade_2", "grade_3"])
+            injury_date = st.date_input("Date of Injury", session_today - timedelta(days=30))
+        
+        with col2:
+            st.subheader("👤 Patient Factors")
+            pred_age = st.number_input("Age", 15, 80, 30, key="pred_age")
+            fitness_level = st.selectbox("Pre-injury Fitness", ["elite", "high", "average", "low", "sedentary"])
+            compliance = st.selectbox("Expected Compliance", ["excellent", "good", "fair", "poor"])
+        
+        # Additional Factors
+        st.subheader("🔍 Additional Factors")
     
-    factor_col1, factor_col2 = st.columns(2)
+        factor_col1, factor_col2 = st.columns(2)
     
-    with factor_col1:
-        comorbidities = st.multiselect("Comorbidities", ["diabetes", "smoking", "obesity", "cardiovascular", "autoimmune"])
-        treatment_quality = st.selectbox("Treatment Quality", ["optimal", "good", "standard", "suboptimal"])
+        with factor_col1:
+            comorbidities = st.multiselect("Comorbidities", ["diabetes", "smoking", "obesity", "cardiovascular", "autoimmune"])
+            treatment_quality = st.selectbox("Treatment Quality", ["optimal", "good", "standard", "suboptimal"])
         
-    with factor_col2:
-        psychological_readiness = st.slider("Psychological Readiness (0-100)", 0, 100, 70, key="psych_ready")
-        primary_goal = st.selectbox("Primary Goal", ["return_to_sport", "return_to_function", "pain_relief"])
+        with factor_col2:
+            psychological_readiness = st.slider("Psychological Readiness (0-100)", 0, 100, 70, key="psych_ready")
+            primary_goal = st.selectbox("Primary Goal", ["return_to_sport", "return_to_function", "pain_relief"])
+        
+        submitted = st.form_submit_button("🔮 Predict Recovery Timeline", use_container_width=True)
     
-    if st.button("🔮 Predict Recovery Timeline", use_container_width=True):
+    if submitted:
         # Prepare prediction data
         injury_data = {
             "injury_type": pred_injury_type,
@@ -248,7 +359,7 @@ with tab2:
         }
         
         # Generate prediction
-        prediction = predict_recovery_timeline(injury_data, patient_factors, treatment_factors)
+        prediction, recommendations = cached_recovery_prediction(injury_data, patient_factors, treatment_factors)
         
         # Display Results
         st.markdown("---")
@@ -268,52 +379,39 @@ with tab2:
             st.metric("Prediction Accuracy", f"{prediction['prediction_accuracy']['percentage']}%")
         
         # Phase Timeline Visualization
-        phases_data = []
-        for phase, data in prediction['phase_timelines'].items():
-            phases_data.append({
-                "Phase": phase.replace("_", " ").title(),
-                "Start": data['start_week'],
-                "Duration": data['duration_weeks'],
-                "End": data['end_week']
-            })
-        
-        df_phases = pd.DataFrame(phases_data)
-        
-        fig = px.timeline(
-            df_phases, 
-            x_start="Start", 
-            x_end="End", 
-            y="Phase",
-            title="Recovery Phase Timeline",
-            labels={'x': 'Weeks from Injury'}
-        )
+        import plotly.graph_objects as go
+        phase_timelines = prediction['phase_timelines'].values()
+        
+        # Horizontal bars starting at each phase's first week (weeks aren't dates, so no px.timeline)
+        fig = go.Figure(go.Bar(
+            y=[display_name(phase) for phase in prediction['phase_timelines']],
+            x=[round(data['end_week'] - data['start_week'], 1) for data in phase_timelines],
+            base=[data['start_week'] for data in phase_timelines],
+            orientation='h'
+        ), layout=PHASE_CHART_LAYOUT)
         st.plotly_chart(fig, use_container_width=True)
         
         # Modifying Factors
         st.subheader("📊 Factors Affecting Timeline")
         modifiers = prediction['modifying_factors']
         
-        factor_data = []
+        # One pass over the modifiers fills every column
+        names, values, effects, impacts = [], [], [], []
         for factor, value in modifiers.items():
-            if factor != 'total_modifier':
-                effect = "Faster" if value < 1.0 else "Slower" if value > 1.0 else "Neutral"
-                factor_data.append({
-                    "Factor": factor.replace("_", " ").title(),
-                    "Modifier": value,
-                    "Effect": effect,
-                    "Impact": f"{abs(1-value)*100:.0f}%"
-                })
-        
-        df_factors = pd.DataFrame(factor_data)
-        st.dataframe(df_factors, use_container_width=True)
+            if factor == 'total_modifier':
+                continue
+            names.append(display_name(factor))
+            values.append(value)
+            effects.append("Faster" if value < 1.0 else "Slower" if value > 1.0 else "Neutral")
+            impacts.append(f"{abs(1-value)*100:.0f}%")
+        factor_table = {"Factor": names, "Modifier": values, "Effect": effects, "Impact": impacts}
+        st.table(factor_table)
         
         # Timeline Optimization Recommendations
-        recommendations = generate_timeline_recommendations(prediction)
         if recommendations:
             st.subheader("🎯 Timeline Optimization")
             for rec in recommendations:
-                priority_colors = {"High": "🔴", "Medium": "🟡", "Low": "🔵"}
-                priority_icon = priority_colors.get(rec['priority'], "📝")
+                priority_icon = PRIORITY_COLORS.get(rec['priority'], "📝")
                 
                 with st.expander(f"{priority_icon} {rec['category']} - {rec['potential_improvement']}"):
                     st.write(f"**Recommendation:** {rec['recommendation']}")
@@ -324,63 +422,67 @@ with tab3:
     st.header("⚠️ Exercise Safety & Contraindications")
     st.markdown("*Comprehensive safety screening for exercise prescription*")
     
-    # Patient Profile for Safety Check
-    col1, col2 = st.columns(2)
+    with st.form("safety_form"):
+        # Patient Profile for Safety Check
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("👤 Patient Profile")
-        safety_age = st.number_input("Age", 15, 90, 35, key="safety_age")
-        pregnant = st.checkbox("Pregnant")
-        trimester = st.selectbox("Trimester", [1, 2, 3]) if pregnant else 1
-        
-        # Medical History
-        st.write("**Medical History:**")
-        unstable_angina = st.checkbox("Unstable angina")
-        uncontrolled_arrhythmia = st.checkbox("Uncontrolled arrhythmia")
-        recent_cardiac_event = st.checkbox("Recent cardiac event (<6 months)")
-        fever = st.checkbox("Current fever/infection")
-        
-    with col2:
-        st.subheader("💊 Current Status")
-        systolic_bp = st.number_input("Systolic BP (mmHg)", 80, 250, 120)
-        blood_glucose = st.number_input("Blood Glucose (mg/dL)", 50, 400, 100)
-        
-        medications = st.multiselect("Current Medications", [
-            "beta_blockers", "blood_thinners", "insulin", "steroids"
-        ])
-        
-        # Current Symptoms
-        current_pain = st.slider("Current Pain Level (0-10)", 0, 10, 0)
+        with col1:
+            st.subheader("👤 Patient Profile")
+            safety_age = st.number_input("Age", 15, 90, 35, key="safety_age")
+            pregnant = st.checkbox("Pregnant")
+            # Form widgets can't appear on the fly, so follow-up questions are always shown
+            trimester = st.selectbox("Trimester (if pregnant)", [1, 2, 3])
+        
+            # Medical History
+            st.write("**Medical History:**")
+            unstable_angina = st.checkbox("Unstable angina")
+            uncontrolled_arrhythmia = st.checkbox("Uncontrolled arrhythmia")
+            recent_cardiac_event = st.checkbox("Recent cardiac event (<6 months)")
+            fever = st.checkbox("Current fever/infection")
+        
+        with col2:
+            st.subheader("💊 Current Status")
+            systolic_bp = st.number_input("Systolic BP (mmHg)", 80, 250, 120)
+            blood_glucose = st.number_input("Blood Glucose (mg/dL)", 50, 400, 100)
+        
+            medications = st.multiselect("Current Medications", [
+                "beta_blockers", "blood_thinners", "insulin", "steroids"
+            ])
+        
+            # Current Symptoms
+            current_pain = st.slider("Current Pain Level (0-10)", 0, 10, 0)
     
-    # Exercise Information
-    st.subheader("🏋️ Proposed Exercise")
+        # Exercise Information
+        st.subheader("🏋️ Proposed Exercise")
     
-    exercise_col1, exercise_col2 = st.columns(2)
+        exercise_col1, exercise_col2 = st.columns(2)
     
-    with exercise_col1:
-        exercise_name = st.text_input("Exercise Name", "Squats")
-        exercise_type = st.selectbox("Exercise Type", [
-            "strength", "cardiovascular", "plyometric", "balance", "flexibility"
-        ])
-        exercise_intensity = st.selectbox("Intensity", ["low", "moderate", "high"])
-        
-    with exercise_col2:
-        position = st.selectbox("Exercise Position", ["standing", "sitting", "supine", "prone", "side_lying"])
-        contact_risk = st.checkbox("Risk of contact/falling")
-        cognitive_demand = st.selectbox("Cognitive Demand", ["low", "moderate", "high"])
+        with exercise_col1:
+            exercise_name = st.text_input("Exercise Name", "Squats")
+            exercise_type = st.selectbox("Exercise Type", [
+                "strength", "cardiovascular", "plyometric", "balance", "flexibility"
+            ])
+            exercise_intensity = st.selectbox("Intensity", ["low", "moderate", "high"])
+        
+        with exercise_col2:
+            position = st.selectbox("Exercise Position", ["standing", "sitting", "supine", "prone", "side_lying"])
+            contact_risk = st.checkbox("Risk of contact/falling")
+            cognitive_demand = st.selectbox("Cognitive Demand", ["low", "moderate", "high"])
     
-    # Injury-Specific Information
-    st.subheader("🩹 Current Injury")
-    current_injury = st.selectbox("Current Injury", ["ACL", "Achilles", "Hamstring", "Rotator_Cuff", "Concussion", "None"])
-    injury_phase = st.selectbox("Injury Phase", ["early", "mid", "late"]) if current_injury != "None" else "mid"
-    rom_limitation = st.slider("ROM Limitation (%)", 0, 80, 0)
+        # Injury-Specific Information
+        st.subheader("🩹 Current Injury")
+        current_injury = st.selectbox("Current Injury", ["ACL", "Achilles", "Hamstring", "Rotator_Cuff", "Concussion", "None"])
+        injury_phase = st.selectbox("Injury Phase", ["early", "mid", "late"], help="Ignored when Current Injury is None")
+        rom_limitation = st.slider("ROM Limitation (%)", 0, 80, 0)
+        
+        submitted = st.form_submit_button("🔍 Check Exercise Safety", use_container_width=True)
     
-    if st.button("🔍 Check Exercise Safety", use_container_width=True):
+    if submitted:
         # Prepare data for safety check
         patient_profile = {
             "age": safety_age,
             "pregnant": pregnant,
-            "trimester": trimester,
+            "trimester": trimester if pregnant else 1,
             "unstable_angina": unstable_angina,
             "uncontrolled_arrhythmia": uncontrolled_arrhythmia,
             "recent_cardiac_event": recent_cardiac_event,
@@ -401,13 +503,13 @@ with tab3:
         
         injury_data = {
             "injury_type": current_injury,
-            "phase": injury_phase,
+            "phase": injury_phase if current_injury != "None" else "mid",
             "current_pain": current_pain,
             "rom_limitation": rom_limitation
         }
         
         # Perform safety check
-        safety_results = check_exercise_contraindications(patient_profile, exercise_data, injury_data)
+        safety_results = phase2.check_exercise_contraindications(patient_profile, exercise_data, injury_data)
         
         # Display Results
         st.markdown("---")
@@ -416,15 +518,7 @@ with tab3:
         safety_level = safety_results['safety_assessment']['level']
         safety_color = safety_results['safety_assessment']['color']
         
-        safety_icons = {
-            "SAFE": "🟢",
-            "LOW_RISK": "🟡", 
-            "MODERATE_RISK": "🟠",
-            "HIGH_RISK": "🔴",
-            "UNSAFE": "⛔"
-        }
-        
-        safety_icon = safety_icons.get(safety_level, "⚪")
+        safety_icon = SAFETY_ICONS.get(safety_level, "⚪")
         
         st.markdown(f"## {safety_icon} Safety Level: {safety_level}")
         st.markdown(f"**Recommendation:** {safety_results['safety_assessment']['recommendation']}")
@@ -432,29 +526,16 @@ with tab3:
         # Contraindications
         contraindications = safety_results['contraindications']
         
-        if contraindications['absolute']:
-            st.error("🚨 **ABSOLUTE CONTRAINDICATIONS**")
-            for contra in contraindications['absolute']:
-                with st.expander(f"⛔ {contra['contraindication']}"):
-                    st.write(f"**Category:** {contra['category']}")
-                    st.write(f"**Action Required:** {contra['action']}")
-                    st.write(f"**Evidence:** {contra['evidence']}")
-        
-        if contraindications['relative']:
-            st.warning("⚠️ **RELATIVE CONTRAINDICATIONS**")
-            for contra in contraindications['relative']:
-                with st.expander(f"⚠️ {contra['contraindication']}"):
-                    st.write(f"**Recommendation:** {contra['recommendation']}")
-                    st.write(f"**Evidence:** {contra['evidence']}")
-        
-        if contraindications['precautions']:
-            st.info("ℹ️ **EXERCISE PRECAUTIONS**")
-            for precaution in contraindications['precautions']:
-                with st.expander(f"⚠️ {precaution['precaution']}"):
-                    st.write(f"**Severity:** {precaution['severity']}")
-                    st.write(f"**Recommendation:** {precaution['recommendation']}")
-                    if 'alternative' in precaution:
-                        st.write(f"**Alternative:** {precaution['alternative']}")
+        for category, (banner, banner_text, icon, title_key, rows) in CONTRAINDICATION_SECTIONS.items():
+            items = contraindications.get(category)
+            if not items:
+                continue
+            banner(banner_text)
+            for item in items:
+                with st.expander(f"{icon} {item[title_key]}"):
+                    for label, field in rows:
+                        if field in item:
+                            st.write(f"**{label}:** {item[field]}")
         
         # Exercise Modifications
         if contraindications['modifications']:
@@ -468,27 +549,30 @@ with tab4:
     st.header("📋 Evidence-Based Treatment Plans")
     st.markdown("*Standardized, customizable treatment protocols*")
     
-    # Treatment Plan Generation
-    col1, col2 = st.columns(2)
+    with st.form("treatment_plan_form"):
+        # Treatment Plan Generation
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("🩺 Diagnosis & Treatment")
-        plan_injury = st.selectbox("Injury/Condition", ["ACL", "Hamstring", "Rotator_Cuff", "Meniscus"], key="plan_injury")
-        plan_severity = st.selectbox("Severity/Approach", ["conservative", "surgical", "grade_1", "grade_2", "grade_3"], key="plan_severity")
-        plan_start_date = st.date_input("Treatment Start Date", datetime.now())
-        
-    with col2:
-        st.subheader("👤 Patient Characteristics")
-        plan_age = st.number_input("Patient Age", 15, 80, 30, key="plan_age")
-        plan_activity = st.selectbox("Activity Level", ["sedentary", "recreational", "competitive", "elite"], key="plan_activity")
-        plan_goal = st.selectbox("Primary Treatment Goal", ["pain_relief", "return_to_function", "return_to_sport"], key="plan_goal")
+        with col1:
+            st.subheader("🩺 Diagnosis & Treatment")
+            plan_injury = st.selectbox("Injury/Condition", ["ACL", "Hamstring", "Rotator_Cuff", "Meniscus"], key="plan_injury")
+            plan_severity = st.selectbox("Severity/Approach", ["conservative", "surgical", "grade_1", "grade_2", "grade_3"], key="plan_severity")
+            plan_start_date = st.date_input("Treatment Start Date", session_today)
+        
+        with col2:
+            st.subheader("👤 Patient Characteristics")
+            plan_age = st.number_input("Patient Age", 15, 80, 30, key="plan_age")
+            plan_activity = st.selectbox("Activity Level", ["sedentary", "recreational", "competitive", "elite"], key="plan_activity")
+            plan_goal = st.selectbox("Primary Treatment Goal", ["pain_relief", "return_to_function", "return_to_sport"], key="plan_goal")
     
-    # Additional Patient Factors
-    st.subheader("🔍 Additional Factors")
-    plan_comorbidities = st.multiselect("Comorbidities", ["diabetes", "osteoporosis", "cardiovascular", "obesity"], key="plan_comorbidities")
-    plan_compliance = st.selectbox("Expected Compliance", ["excellent", "good", "fair", "poor"], key="plan_compliance")
+        # Additional Patient Factors
+        st.subheader("🔍 Additional Factors")
+        plan_comorbidities = st.multiselect("Comorbidities", ["diabetes", "osteoporosis", "cardiovascular", "obesity"], key="plan_comorbidities")
+        plan_compliance = st.selectbox("Expected Compliance", ["excellent", "good", "fair", "poor"], key="plan_compliance")
+        
+        submitted = st.form_submit_button("📋 Generate Treatment Plan", use_container_width=True)
     
-    if st.button("📋 Generate Treatment Plan", use_container_width=True):
+    if submitted:
         # Prepare treatment plan data
         injury_data = {
             "injury_type": plan_injury,
@@ -510,7 +594,7 @@ with tab4:
         }
         
         # Generate treatment plan
-        treatment_plan = generate_treatment_plan(injury_data, patient_profile, treatment_goals)
+        treatment_plan = phase2.generate_treatment_plan(injury_data, patient_profile, treatment_goals)
         
         # Display Treatment Plan
         st.markdown("---")
@@ -532,24 +616,21 @@ with tab4:
         # Phase Timeline
         st.subheader("📅 Treatment Timeline")
         
-        timeline_phases = []
-        for phase_name, phase_timeline in timeline_data['phases'].items():
-            timeline_phases.append({
-                "Phase": phase_name.replace("_", " ").title(),
-                "Start Date": phase_timeline['start_date'],
-                "End Date": phase_timeline['end_date'],
-                "Duration (weeks)": phase_timeline['duration_weeks'],
-                "Key Goals": ", ".join(phase_timeline['goals'][:2])  # First 2 goals
-            })
-        
-        df_timeline = pd.DataFrame(timeline_phases)
-        st.dataframe(df_timeline, use_container_width=True)
+        phase_timelines = timeline_data['phases']
+        timeline_table = {
+            "Phase": [display_name(phase_name) for phase_name in phase_timelines],
+            "Start Date": [phase_timeline['start_date'] for phase_timeline in phase_timelines.values()],
+            "End Date": [phase_timeline['end_date'] for phase_timeline in phase_timelines.values()],
+            "Duration (weeks)": [phase_timeline['duration_weeks'] for phase_timeline in phase_timelines.values()],
+            "Key Goals": [", ".join(phase_timeline['goals'][:2]) for phase_timeline in phase_timelines.values()]  # First 2 goals
+        }
+        st.table(timeline_table)
         
         # Detailed Phase Information
         st.subheader("📖 Phase Details")
         
         for phase_name, phase_data in plan_data['phases'].items():
-            with st.expander(f"📌 {phase_name.replace('_', ' ').title()} - {timeline_data['phases'][phase_name]['duration_weeks']} weeks"):
+            with st.expander(f"📌 {display_name(phase_name)} - {timeline_data['phases'][phase_name]['duration_weeks']} weeks"):
                 
                 phase_col1, phase_col2 = st.columns(2)
                 
@@ -577,17 +658,14 @@ with tab4:
         if 'milestones' in timeline_data:
             st.subheader("🎯 Key Milestones")
             
-            milestone_data = []
-            for milestone_name, milestone_info in timeline_data['milestones'].items():
-                milestone_data.append({
-                    "Milestone": milestone_name.replace("_", " ").title(),
-                    "Target Date": milestone_info['target_date'],
-                    "Description": milestone_info['description'],
-                    "Assessment": milestone_info.get('assessment', 'Clinical evaluation')
-                })
-            
-            df_milestones = pd.DataFrame(milestone_data)
-            st.dataframe(df_milestones, use_container_width=True)
+            milestones = timeline_data['milestones']
+            milestone_table = {
+                "Milestone": [display_name(milestone_name) for milestone_name in milestones],
+                "Target Date": [milestone_info['target_date'] for milestone_info in milestones.values()],
+                "Description": [milestone_info['description'] for milestone_info in milestones.values()],
+                "Assessment": [milestone_info.get('assessment', 'Clinical evaluation') for milestone_info in milestones.values()]
+            }
+            st.table(milestone_table)
         
         # Documentation and Export
         st.subheader("📄 Documentation")
@@ -601,20 +679,7 @@ with tab4:
         st.write("**Follow-up Schedule:**")
         st.write(f"• Reassessments: {doc_data['outcome_measures']['reassessment_frequency']}")
         
-        # Export Options
-        st.subheader("📤 Export Options")
-        
-        export_col1, export_col2 = st.columns(2)
-        
-        with export_col1:
-            if st.button("📄 Export as PDF", use_container_width=True):
-                export_result = export_treatment_plan(treatment_plan, "pdf")
-                st.success(f"✅ Plan exported: {export_result['file_name']}")
-        
-        with export_col2:
-            if st.button("📊 Export as Excel", use_container_width=True):
-                export_result = export_treatment_plan(treatment_plan, "xlsx")
-                st.success(f"✅ Plan exported: {export_result['file_name']}")
+        render_export_options(treatment_plan)
 
 # Add instructions and evidence base
 st.markdown("---")
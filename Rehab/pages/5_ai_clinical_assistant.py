@@ -1,11 +1,13 @@
 import streamlit as st
 import numpy as np
-from PIL import Image, ImageDraw
+import cv2
+from PIL import Image
 import math
 from datetime import datetime
 import pandas as pd
-import base64
+import pyarrow as pa
 import io
+import hashlib
 
 # Page configuration
 st.set_page_config(
@@ -29,113 +31,216 @@ if 'original_image' not in st.session_state:
 if 'current_view' not in st.session_state:
     st.session_state.current_view = None
 
+# Static page content
+CAMERA_CSS = """
+<style>
+.stCamera > div {
+    width: 100% !important;
+    max-width: 800px !important;
+}
+.stCamera > div > div {
+    width: 100% !important;
+    height: 500px !important;
+    aspect-ratio: 16/10 !important;
+}
+.stCamera > div > div > div > video {
+    width: 100% !important;
+    height: 100% !important;
+    object-fit: cover !important;
+    border-radius: 10px !important;
+    border: 2px solid #0066cc !important;
+}
+</style>
+"""
+
+CLINICAL_INSTRUCTIONS = """
+**For optimal clinical analysis:**
+
+📸 **Photo Setup:**
+- **Side view positioning** (90° to camera)
+- Full body visible (head to feet)
+- Arms relaxed at sides
+- Natural standing position
+- Good lighting, plain background
+
+🎯 **Measurement Points:**
+- 🔴 **Red dots:** Poor alignment (Score 1)
+- 🟠 **Orange dots:** Fair alignment (Score 2) 
+- 🟡 **Yellow dots:** Good alignment (Score 3)
+- 🟢 **Green dots:** Excellent alignment (Score 4)
+"""
+
+CAMERA_INSTRUCTIONS = "**Instructions:** Stand facing or sideways to camera, full body visible in vertical frame"
+
+# Overall status color -> (message box, icon)
+STATUS_DISPLAY = {
+    'success': (st.success, "✅"),
+    'info': (st.info, "ℹ️"),
+    'warning': (st.warning, "⚠️"),
+    'error': (st.error, "❌")
+}
+
+LEGEND_HTML = """
+<div style='display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;'>
+<div>
+<strong>📍 Measurement Points:</strong>
+<ul>
+<li><strong>Skull:</strong> Head position assessment</li>
+<li><strong>Shoulders:</strong> Left/right symmetry</li>
+<li><strong>Hips:</strong> Pelvic level evaluation</li>
+<li><strong>Knees:</strong> Lower limb alignment</li>
+<li><strong>Ankles:</strong> Base of support</li>
+</ul>
+</div>
+<div>
+<strong>🎨 Color Coding:</strong>
+<ul>
+<li>🟢 <strong>Green:</strong> Excellent (Score 4)</li>
+<li>🟡 <strong>Yellow:</strong> Good (Score 3)</li>
+<li>🟠 <strong>Orange:</strong> Fair (Score 2)</li>
+<li>🔴 <strong>Red:</strong> Poor (Score 1)</li>
+</ul>
+</div>
+</div>
+"""
+
+FOOTER_HTML = """
+<div style='text-align: center; color: inherit; opacity: 0.7; font-size: 14px;'>
+💙 <strong>AI Clinical Assistant</strong> • Visual posture analysis with clinical measurement validation<br>
+Quantified assessment • Evidence-based scoring • Professional documentation
+</div>
+"""
+
+# Landmark layout: one (x, y) row per anatomical point
+class LM:
+    """Row indices into the landmark coordinate array"""
+    SKULL = 0
+    L_SHOULDER = 1
+    R_SHOULDER = 2
+    SHOULDER_C = 3
+    L_HIP = 4
+    R_HIP = 5
+    HIP_C = 6
+    L_KNEE = 7
+    R_KNEE = 8
+    L_ANKLE = 9
+    R_ANKLE = 10
+
+LANDMARK_NAMES = (
+    'skull', 'left_shoulder', 'right_shoulder', 'shoulder_center',
+    'left_hip', 'right_hip', 'hip_center',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
+)
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+# Shoulder and hip centers are the midpoints of these left/right pairs
+CENTER_ROWS = [LM.SHOULDER_C, LM.HIP_C]
+LEFT_ROWS = [LM.L_SHOULDER, LM.L_HIP]
+RIGHT_ROWS = [LM.R_SHOULDER, LM.R_HIP]
+
+# Fallback landmark positions as (x, y) fractions of image width/height
+FALLBACK_FRACTIONS = np.array([
+    (0.50, 0.08),   # skull
+    (0.38, 0.18),   # left shoulder
+    (0.62, 0.18),   # right shoulder
+    (0.50, 0.18),   # shoulder center
+    (0.42, 0.50),   # left hip
+    (0.58, 0.50),   # right hip
+    (0.50, 0.50),   # hip center
+    (0.44, 0.75),   # left knee
+    (0.56, 0.75),   # right knee
+    (0.46, 0.92),   # left ankle
+    (0.54, 0.92)    # right ankle
+], dtype=np.float32)
+
+def empty_landmarks():
+    """Allocate an (N, 2) int32 landmark array"""
+    return np.zeros((len(LANDMARK_NAMES), 2), dtype=np.int32)
+
 def detect_body_region(image_array):
     """Detect the actual body region, excluding shadows and background"""
-    height, width = image_array.shape[:2]
-    
     if len(image_array.shape) == 3:
-        # RGB analysis
-        r, g, b = image_array[:,:,0], image_array[:,:,1], image_array[:,:,2]
+        # RGB analysis (drop any alpha channel)
+        rgb = image_array if image_array.shape[2] == 3 else np.ascontiguousarray(image_array[:, :, :3])
         
-        # Skin tone detection
-        skin_mask = ((r > 95) & (g > 40) & (b > 20) & 
-                     (np.maximum(np.maximum(r, g), b) - np.minimum(np.minimum(r, g), b) > 15) &
-                     (np.abs(r - g) > 15) & (r > g) & (r > b))
+        # One color conversion feeds both masks: the Y channel is the gray level
+        ycrcb = cv2.cvtColor(rgb, cv2.COLOR_RGB2YCrCb)
+        gray = cv2.extractChannel(ycrcb, 0)
         
-        # Clothing detection
-        gray = np.mean(image_array, axis=2)
-        clothing_mask = ((gray > 30) & (gray < 200) & ~skin_mask)
+        # Skin tone detection on YCrCb chroma bounds
+        skin_mask = cv2.inRange(ycrcb, (0, 133, 77), (255, 173, 127))
+        
+        # Clothing detection (mid-range gray levels)
+        clothing_mask = cv2.inRange(gray, 31, 199)
         
         # Combine skin and clothing
-        body_mask = skin_mask | clothing_mask
+        body_mask = cv2.bitwise_or(skin_mask, clothing_mask)
         
-        # Simple noise reduction
+        # Simple noise reduction: opening (pixels outside the image count as background)
         kernel = np.ones((3,3), np.uint8)
-        body_mask = binary_erosion(body_mask, kernel)
-        body_mask = binary_dilation(body_mask, kernel)
+        body_mask = cv2.morphologyEx(body_mask, cv2.MORPH_OPEN, kernel,
+                                     borderType=cv2.BORDER_CONSTANT, borderValue=0)
+        
+        # 0/255 -> 0/1 in place
+        body_mask &= 1
     else:
-        gray = image_array
-        body_mask = (gray > 50) & (gray < 220)
+        body_mask = ((image_array > 50) & (image_array < 220)).view(np.uint8)
     
+    # uint8 0/1 mask
     return body_mask
 
-def binary_erosion(image, kernel):
-    """Simple binary erosion"""
-    result = np.zeros_like(image, dtype=bool)
-    kh, kw = kernel.shape
-    padded = np.pad(image, ((kh//2, kh//2), (kw//2, kw//2)), mode='constant')
-    
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            region = padded[i:i+kh, j:j+kw]
-            if np.all(region[kernel == 1]):
-                result[i, j] = True
-    return result
-
-def binary_dilation(image, kernel):
-    """Simple binary dilation"""
-    result = np.zeros_like(image, dtype=bool)
-    kh, kw = kernel.shape
-    padded = np.pad(image, ((kh//2, kh//2), (kw//2, kw//2)), mode='constant')
-    
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
-            region = padded[i:i+kh, j:j+kw]
-            if np.any(region[kernel == 1]):
-                result[i, j] = True
-    return result
-
-def find_body_centerline(body_mask, height):
+def scan_body_rows(body_mask):
+    """Scan the mask once per row: pixel count, column-index sum, leftmost and rightmost body column"""
+    width = body_mask.shape[1]
+    row_counts = np.count_nonzero(body_mask, axis=1)
+    row_sums = body_mask @ np.arange(width, dtype=np.int32)
+    row_left = np.argmax(body_mask, axis=1)
+    row_right = width - 1 - np.argmax(body_mask[:, ::-1], axis=1)
+    return row_counts, row_sums, row_left, row_right
+
+def find_body_centerline(row_counts, row_sums, width):
     """Find the centerline of the body at each height level"""
-    centerline = []
+    height = len(row_counts)
     
-    for y in range(height):
-        row = body_mask[y, :]
-        body_pixels = np.where(row)[0]
-        
-        if len(body_pixels) > 0:
-            center_x = int(np.mean(body_pixels))
-        else:
-            center_x = centerline[-1] if centerline else body_mask.shape[1] // 2
-        
-        centerline.append(center_x)
+    # Mean body column per row: column-index sum over pixel count
+    has_body = row_counts > 0
+    centers = row_sums // np.maximum(row_counts, 1)
     
-    # Smooth the centerline
-    window_size = 5
-    smoothed = []
-    for i in range(len(centerline)):
-        start_idx = max(0, i - window_size//2)
-        end_idx = min(len(centerline), i + window_size//2 + 1)
-        window_values = centerline[start_idx:end_idx]
-        smoothed.append(int(np.mean(window_values)))
+    # Empty rows repeat the last row with body pixels (image center before any)
+    last_body_row = np.maximum.accumulate(np.where(has_body, np.arange(height), -1))
+    centerline = np.where(last_body_row >= 0, centers[np.maximum(last_body_row, 0)], width // 2)
     
-    return smoothed
+    return smooth_centerline(centerline)
 
-def find_body_boundaries(body_mask):
+def smooth_centerline(centerline, window_size=5):
+    """Moving-average the centerline, truncating the window at the image edges"""
+    values = np.asarray(centerline, dtype=np.int32)
+    window = np.ones(window_size, dtype=np.int32)
+    
+    # Integer window sums and sizes in one pass each; edge windows hold fewer rows
+    centered = slice(window_size // 2, window_size // 2 + len(values))
+    sums = np.convolve(values, window, mode='full')[centered]
+    counts = np.convolve(np.ones_like(values), window, mode='full')[centered]
+    
+    # Columns are non-negative, so floor division matches truncating the mean
+    return sums // counts
+
+def find_body_boundaries(row_counts, row_left, row_right):
     """Find the top, bottom, left, and right boundaries of the body"""
-    body_pixels = np.where(body_mask)
+    has_body = row_counts > 0
     
-    if len(body_pixels[0]) > 0:
-        body_top = np.min(body_pixels[0])
-        body_bottom = np.max(body_pixels[0])
-        body_left = np.min(body_pixels[1])
-        body_right = np.max(body_pixels[1])
+    if has_body.any():
+        body_top = int(has_body.argmax())
+        body_bottom = len(has_body) - 1 - int(has_body[::-1].argmax())
+        body_left = int(row_left[has_body].min())
+        body_right = int(row_right[has_body].max())
         return body_top, body_bottom, body_left, body_right
     else:
         return None, None, None, None
 
-def estimate_width_at_height(body_mask, y):
-    """Estimate body width at given height"""
-    if y >= body_mask.shape[0]:
-        return body_mask.shape[1] // 4
-    
-    row = body_mask[y, :]
-    body_pixels = np.where(row)[0]
-    
-    if len(body_pixels) > 0:
-        return int(np.max(body_pixels) - np.min(body_pixels))
-    else:
-        return body_mask.shape[1] // 4
+def estimate_row_widths(row_counts, row_left, row_right, width):
+    """Estimate body width at every height (a quarter of the image width for empty rows)"""
+    return np.where(row_counts > 0, row_right - row_left, width // 4)
 
 def estimate_anatomical_landmarks(image_array):
     """Estimate key anatomical landmarks using body detection"""
@@ -143,12 +248,16 @@ def estimate_anatomical_landmarks(image_array):
     
     # Find body region
     body_mask = detect_body_region(image_array)
-    body_center_x = find_body_centerline(body_mask, height)
     
-    landmarks = {}
+    # One row scan feeds the centerline, widths and boundaries
+    row_counts, row_sums, row_left, row_right = scan_body_rows(body_mask)
+    body_center_x = find_body_centerline(row_counts, row_sums, width)
+    row_widths = estimate_row_widths(row_counts, row_left, row_right, width)
+    
+    landmarks = empty_landmarks()
     
     # Find body boundaries
-    body_top, body_bottom, body_left, body_right = find_body_boundaries(body_mask)
+    body_top, body_bottom, body_left, body_right = find_body_boundaries(row_counts, row_left, row_right)
     
     if body_top is not None and body_bottom is not None:
         body_height = body_bottom - body_top
@@ -156,257 +265,215 @@ def estimate_anatomical_landmarks(image_array):
         # Head/Skull
         head_y = body_top + int(body_height * 0.12)
         head_x = body_center_x[min(head_y, len(body_center_x)-1)]
-        landmarks['skull'] = (head_x, head_y)
+        landmarks[LM.SKULL] = (head_x, head_y)
         
         # Shoulders
         shoulder_y = body_top + int(body_height * 0.20)
         shoulder_center_x = body_center_x[min(shoulder_y, len(body_center_x)-1)]
-        shoulder_width = estimate_width_at_height(body_mask, shoulder_y)
-        landmarks['left_shoulder'] = (shoulder_center_x - shoulder_width//2, shoulder_y)
-        landmarks['right_shoulder'] = (shoulder_center_x + shoulder_width//2, shoulder_y)
-        landmarks['shoulder_center'] = (shoulder_center_x, shoulder_y)
+        shoulder_width = int(row_widths[shoulder_y])
+        landmarks[LM.L_SHOULDER] = (shoulder_center_x - shoulder_width//2, shoulder_y)
+        landmarks[LM.R_SHOULDER] = (shoulder_center_x + shoulder_width//2, shoulder_y)
+        landmarks[LM.SHOULDER_C] = (shoulder_center_x, shoulder_y)
         
         # Hips
         hip_y = body_top + int(body_height * 0.55)
         hip_center_x = body_center_x[min(hip_y, len(body_center_x)-1)]
-        hip_width = int(estimate_width_at_height(body_mask, hip_y) * 0.8)
-        landmarks['left_hip'] = (hip_center_x - hip_width//2, hip_y)
-        landmarks['right_hip'] = (hip_center_x + hip_width//2, hip_y)
-        landmarks['hip_center'] = (hip_center_x, hip_y)
+        hip_width = int(row_widths[hip_y] * 0.8)
+        landmarks[LM.L_HIP] = (hip_center_x - hip_width//2, hip_y)
+        landmarks[LM.R_HIP] = (hip_center_x + hip_width//2, hip_y)
+        landmarks[LM.HIP_C] = (hip_center_x, hip_y)
         
         # Knees
         knee_y = body_top + int(body_height * 0.75)
         knee_center_x = body_center_x[min(knee_y, len(body_center_x)-1)]
-        knee_width = int(estimate_width_at_height(body_mask, knee_y) * 0.6)
-        landmarks['left_knee'] = (knee_center_x - knee_width//2, knee_y)
-        landmarks['right_knee'] = (knee_center_x + knee_width//2, knee_y)
+        knee_width = int(row_widths[knee_y] * 0.6)
+        landmarks[LM.L_KNEE] = (knee_center_x - knee_width//2, knee_y)
+        landmarks[LM.R_KNEE] = (knee_center_x + knee_width//2, knee_y)
         
         # Ankles
         ankle_y = body_top + int(body_height * 0.92)
         ankle_center_x = body_center_x[min(ankle_y, len(body_center_x)-1)]
-        ankle_width = int(estimate_width_at_height(body_mask, ankle_y) * 0.4)
-        landmarks['left_ankle'] = (ankle_center_x - ankle_width//2, ankle_y)
-        landmarks['right_ankle'] = (ankle_center_x + ankle_width//2, ankle_y)
+        ankle_width = int(row_widths[ankle_y] * 0.4)
+        landmarks[LM.L_ANKLE] = (ankle_center_x - ankle_width//2, ankle_y)
+        landmarks[LM.R_ANKLE] = (ankle_center_x + ankle_width//2, ankle_y)
     else:
         # Fallback proportions
-        center_x = width // 2
-        landmarks = {
-            'skull': (center_x, int(height * 0.08)),
-            'left_shoulder': (center_x - int(width * 0.12), int(height * 0.18)),
-            'right_shoulder': (center_x + int(width * 0.12), int(height * 0.18)),
-            'shoulder_center': (center_x, int(height * 0.18)),
-            'left_hip': (center_x - int(width * 0.08), int(height * 0.50)),
-            'right_hip': (center_x + int(width * 0.08), int(height * 0.50)),
-            'hip_center': (center_x, int(height * 0.50)),
-            'left_knee': (center_x - int(width * 0.06), int(height * 0.75)),
-            'right_knee': (center_x + int(width * 0.06), int(height * 0.75)),
-            'left_ankle': (center_x - int(width * 0.04), int(height * 0.92)),
-            'right_ankle': (center_x + int(width * 0.04), int(height * 0.92))
-        }
+        landmarks = (FALLBACK_FRACTIONS * np.array([width, height], dtype=np.float32)).astype(np.int32)
     
     return landmarks
 
+# Each measurement is the offset between two landmarks along one axis (0 = x, 1 = y),
+# as a percentage of the image width (x) or height (y)
+MEASUREMENT_KEYS = ('head_alignment', 'shoulder_symmetry', 'hip_symmetry', 'vertical_alignment')
+MEASUREMENT_FROM = [LM.SKULL, LM.L_SHOULDER, LM.L_HIP, LM.SHOULDER_C]
+MEASUREMENT_TO = [LM.SHOULDER_C, LM.R_SHOULDER, LM.R_HIP, LM.HIP_C]
+MEASUREMENT_AXES = [0, 1, 1, 0]
+
 def calculate_clinical_measurements(landmarks, width, height):
     """Calculate clinical measurements from landmarks"""
-    measurements = {}
-    
-    # Head alignment
-    skull_x = landmarks['skull'][0]
-    shoulder_center_x = landmarks['shoulder_center'][0]
-    head_forward_distance = abs(skull_x - shoulder_center_x)
-    measurements['head_alignment'] = (head_forward_distance / width) * 100
-    
-    # Shoulder symmetry
-    left_shoulder_y = landmarks['left_shoulder'][1]
-    right_shoulder_y = landmarks['right_shoulder'][1]
-    shoulder_height_diff = abs(left_shoulder_y - right_shoulder_y)
-    measurements['shoulder_symmetry'] = (shoulder_height_diff / height) * 100
-    
-    # Hip symmetry
-    left_hip_y = landmarks['left_hip'][1]
-    right_hip_y = landmarks['right_hip'][1]
-    hip_height_diff = abs(left_hip_y - right_hip_y)
-    measurements['hip_symmetry'] = (hip_height_diff / height) * 100
-    
-    # Vertical alignment
-    hip_center_x = landmarks['hip_center'][0]
-    vertical_offset = abs(shoulder_center_x - hip_center_x)
-    measurements['vertical_alignment'] = (vertical_offset / width) * 100
-    
-    return measurements
-
-def calculate_head_score(head_alignment_percent):
-    """Calculate head position score"""
-    if head_alignment_percent <= 2:
-        return 4
-    elif head_alignment_percent <= 4:
-        return 3
-    elif head_alignment_percent <= 7:
-        return 2
-    else:
-        return 1
-
-def calculate_shoulder_score(shoulder_asymmetry_percent):
-    """Calculate shoulder score"""
-    if shoulder_asymmetry_percent <= 1:
-        return 4
-    elif shoulder_asymmetry_percent <= 2:
-        return 3
-    elif shoulder_asymmetry_percent <= 4:
-        return 2
-    else:
-        return 1
-
-def calculate_hip_score(hip_asymmetry_percent):
-    """Calculate hip score"""
-    if hip_asymmetry_percent <= 1:
-        return 4
-    elif hip_asymmetry_percent <= 2:
-        return 3
-    elif hip_asymmetry_percent <= 3:
-        return 2
-    else:
-        return 1
-
-def calculate_alignment_score(vertical_alignment_percent):
-    """Calculate alignment score"""
-    if vertical_alignment_percent <= 3:
-        return 4
-    elif vertical_alignment_percent <= 5:
-        return 3
-    elif vertical_alignment_percent <= 8:
-        return 2
-    else:
-        return 1
+    offsets = np.abs(
+        landmarks[MEASUREMENT_FROM, MEASUREMENT_AXES].astype(np.int64)
+        - landmarks[MEASUREMENT_TO, MEASUREMENT_AXES]
+    )
+    percentages = offsets / np.array([width, height, height, width]) * 100
+    
+    return dict(zip(MEASUREMENT_KEYS, percentages.tolist()))
+
+# Upper bounds (inclusive) of the 4-, 3- and 2-point bands per measurement; anything above scores 1
+HEAD_THRESHOLDS = np.array([2, 4, 7])
+SHOULDER_THRESHOLDS = np.array([1, 2, 4])
+HIP_THRESHOLDS = np.array([1, 2, 3])
+ALIGNMENT_THRESHOLDS = np.array([3, 5, 8])
+SCORE_THRESHOLDS = np.stack([HEAD_THRESHOLDS, SHOULDER_THRESHOLDS, HIP_THRESHOLDS, ALIGNMENT_THRESHOLDS])
+
+def score_frames(measurement_frames):
+    """Score (head, shoulder, hip, alignment) measurements, one row or a whole batch, in one call"""
+    measurement_frames = np.asarray(measurement_frames, dtype=np.float64)
+    return 4 - (measurement_frames[..., None] > SCORE_THRESHOLDS).sum(axis=-1)
+
+# Assessment wording per region, ordered from band 0 (excellent) to band 3 (poor)
+ASSESSMENT_REGIONS = (
+    ('head', 'head_score', 'head_alignment'),
+    ('shoulder', 'shoulder_score', 'shoulder_symmetry'),
+    ('hip', 'hip_score', 'hip_symmetry'),
+    ('alignment', 'alignment_score', 'vertical_alignment')
+)
+ASSESSMENT_TEXT = {
+    'head': (
+        "Excellent head positioning ({:.1f}% forward)",
+        "Good head alignment ({:.1f}% forward)",
+        "Moderate forward head posture ({:.1f}% forward)",
+        "Significant forward head posture ({:.1f}% forward)"
+    ),
+    'shoulder': (
+        "Excellent shoulder alignment ({:.1f}% difference)",
+        "Good shoulder positioning ({:.1f}% difference)",
+        "Moderate shoulder asymmetry ({:.1f}% difference)",
+        "Significant shoulder imbalance ({:.1f}% difference)"
+    ),
+    'hip': (
+        "Excellent hip alignment ({:.1f}% difference)",
+        "Good hip positioning ({:.1f}% difference)",
+        "Moderate hip asymmetry ({:.1f}% difference)",
+        "Significant hip imbalance ({:.1f}% difference)"
+    ),
+    'alignment': (
+        "Excellent overall alignment ({:.1f}% offset)",
+        "Good vertical alignment ({:.1f}% offset)",
+        "Moderate alignment issues ({:.1f}% offset)",
+        "Poor overall alignment ({:.1f}% offset)"
+    )
+}
+BAND_COLORS = ("🟢", "🟡", "🟠", "🔴")
+SCORE_BAND_EDGES = np.array([2, 3, 4])
+
+# Overall status, ordered from the lowest percentage band to the highest
+OVERALL_STATUS = (
+    ("Very poor posture - urgent attention", "error", "Very High"),
+    ("Poor posture - intervention needed", "error", "High"),
+    ("Moderate posture concerns", "warning", "Moderate"),
+    ("Good posture with minor issues", "info", "Low"),
+    ("Excellent posture detected", "success", "Very Low")
+)
+OVERALL_PERCENT_EDGES = np.array([40, 55, 70, 85])
+
+def score_bands(scores):
+    """Map region scores (any shape) to assessment bands, 0 = excellent to 3 = poor"""
+    return 3 - np.searchsorted(SCORE_BAND_EDGES, scores, side='right')
 
 def generate_detailed_assessments(analysis):
     """Generate detailed assessments"""
     assessments = {}
     measurements = analysis['measurements']
     
-    # Head assessment
-    head_score = analysis['head_score']
-    head_measurement = measurements['head_alignment']
-    if head_score >= 4:
-        assessments['head_assessment'] = f"Excellent head positioning ({head_measurement:.1f}% forward)"
-        assessments['head_color'] = "🟢"
-    elif head_score >= 3:
-        assessments['head_assessment'] = f"Good head alignment ({head_measurement:.1f}% forward)"
-        assessments['head_color'] = "🟡"
-    elif head_score >= 2:
-        assessments['head_assessment'] = f"Moderate forward head posture ({head_measurement:.1f}% forward)"
-        assessments['head_color'] = "🟠"
-    else:
-        assessments['head_assessment'] = f"Significant forward head posture ({head_measurement:.1f}% forward)"
-        assessments['head_color'] = "🔴"
-    
-    # Shoulder assessment
-    shoulder_score = analysis['shoulder_score']
-    shoulder_measurement = measurements['shoulder_symmetry']
-    if shoulder_score >= 4:
-        assessments['shoulder_assessment'] = f"Excellent shoulder alignment ({shoulder_measurement:.1f}% difference)"
-        assessments['shoulder_color'] = "🟢"
-    elif shoulder_score >= 3:
-        assessments['shoulder_assessment'] = f"Good shoulder positioning ({shoulder_measurement:.1f}% difference)"
-        assessments['shoulder_color'] = "🟡"
-    elif shoulder_score >= 2:
-        assessments['shoulder_assessment'] = f"Moderate shoulder asymmetry ({shoulder_measurement:.1f}% difference)"
-        assessments['shoulder_color'] = "🟠"
-    else:
-        assessments['shoulder_assessment'] = f"Significant shoulder imbalance ({shoulder_measurement:.1f}% difference)"
-        assessments['shoulder_color'] = "🔴"
-    
-    # Hip assessment
-    hip_score = analysis['hip_score']
-    hip_measurement = measurements['hip_symmetry']
-    if hip_score >= 4:
-        assessments['hip_assessment'] = f"Excellent hip alignment ({hip_measurement:.1f}% difference)"
-        assessments['hip_color'] = "🟢"
-    elif hip_score >= 3:
-        assessments['hip_assessment'] = f"Good hip positioning ({hip_measurement:.1f}% difference)"
-        assessments['hip_color'] = "🟡"
-    elif hip_score >= 2:
-        assessments['hip_assessment'] = f"Moderate hip asymmetry ({hip_measurement:.1f}% difference)"
-        assessments['hip_color'] = "🟠"
-    else:
-        assessments['hip_assessment'] = f"Significant hip imbalance ({hip_measurement:.1f}% difference)"
-        assessments['hip_color'] = "🔴"
-    
-    # Alignment assessment
-    alignment_score = analysis['alignment_score']
-    alignment_measurement = measurements['vertical_alignment']
-    if alignment_score >= 4:
-        assessments['alignment_assessment'] = f"Excellent overall alignment ({alignment_measurement:.1f}% offset)"
-        assessments['alignment_color'] = "🟢"
-    elif alignment_score >= 3:
-        assessments['alignment_assessment'] = f"Good vertical alignment ({alignment_measurement:.1f}% offset)"
-        assessments['alignment_color'] = "🟡"
-    elif alignment_score >= 2:
-        assessments['alignment_assessment'] = f"Moderate alignment issues ({alignment_measurement:.1f}% offset)"
-        assessments['alignment_color'] = "🟠"
-    else:
-        assessments['alignment_assessment'] = f"Poor overall alignment ({alignment_measurement:.1f}% offset)"
-        assessments['alignment_color'] = "🔴"
+    # Band all region scores in one pass, then format the wording
+    bands = score_bands([analysis[score_key] for _, score_key, _ in ASSESSMENT_REGIONS])
+    for (region, _, measurement_key), band in zip(ASSESSMENT_REGIONS, bands.tolist()):
+        assessments[f'{region}_assessment'] = ASSESSMENT_TEXT[region][band].format(measurements[measurement_key])
+        assessments[f'{region}_color'] = BAND_COLORS[band]
     
     # Overall status
-    percentage = analysis['percentage']
-    if percentage >= 85:
-        assessments['overall'] = "Excellent posture detected"
-        assessments['overall_color'] = "success"
-        assessments['risk_level'] = "Very Low"
-    elif percentage >= 70:
-        assessments['overall'] = "Good posture with minor issues"
-        assessments['overall_color'] = "info"
-        assessments['risk_level'] = "Low"
-    elif percentage >= 55:
-        assessments['overall'] = "Moderate posture concerns"
-        assessments['overall_color'] = "warning"
-        assessments['risk_level'] = "Moderate"
-    elif percentage >= 40:
-        assessments['overall'] = "Poor posture - intervention needed"
-        assessments['overall_color'] = "error"
-        assessments['risk_level'] = "High"
-    else:
-        assessments['overall'] = "Very poor posture - urgent attention"
-        assessments['overall_color'] = "error"
-        assessments['risk_level'] = "Very High"
+    status_idx = int(np.searchsorted(OVERALL_PERCENT_EDGES, analysis['percentage'], side='right'))
+    overall, overall_color, risk_level = OVERALL_STATUS[status_idx]
+    assessments['overall'] = overall
+    assessments['overall_color'] = overall_color
+    assessments['risk_level'] = risk_level
     
     return assessments
 
-def create_annotated_image(image_array, landmarks, analysis):
-    """Create image with clinical measurement dots and lines"""
+def to_jpeg_bytes(image_array, quality=85):
+    """Encode an RGB(A) or grayscale array as JPEG bytes with OpenCV"""
+    if image_array.ndim == 2:
+        bgr = image_array
+    else:
+        conversion = cv2.COLOR_RGBA2BGR if image_array.shape[2] == 4 else cv2.COLOR_RGB2BGR
+        bgr = cv2.cvtColor(image_array, conversion)
+    _, buffer = cv2.imencode('.jpg', bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+def to_display_bytes(image_array, max_width=900):
+    """Downsample an image array for display and encode it once as JPEG"""
     if image_array.dtype != np.uint8:
         image_array = (image_array * 255).astype(np.uint8)
+    height, width = image_array.shape[:2]
+    if width > max_width:
+        image_array = cv2.resize(image_array, (max_width, int(height * max_width / width)), interpolation=cv2.INTER_LINEAR)
+    return to_jpeg_bytes(image_array)
+
+def get_original_display_bytes(image_array, image_id):
+    """Return the encoded original photo for an upload, building it once per file"""
+    if st.session_state.original_image is None or st.session_state.get('original_image_id') != image_id:
+        st.session_state.original_image = to_display_bytes(image_array)
+        st.session_state.original_image_id = image_id
+    return st.session_state.original_image
+
+def to_rgb_canvas(image_array):
+    """Copy an image into a uint8 RGB array to draw annotations on"""
+    if image_array.dtype != np.uint8:
+        image_array = (image_array * 255).astype(np.uint8)
+    if image_array.ndim == 2:
+        return cv2.cvtColor(image_array, cv2.COLOR_GRAY2RGB)
+    if image_array.shape[2] == 4:
+        return cv2.cvtColor(image_array, cv2.COLOR_RGBA2RGB)
+    return image_array.copy()
+
+def create_annotated_image(image_array, landmarks, analysis):
+    """Create image with clinical measurement dots and lines"""
+    # OpenCV draws in place, so work on a copy of the photo
+    canvas = to_rgb_canvas(image_array)
+    width = canvas.shape[1]
     
-    pil_image = Image.fromarray(image_array)
-    draw = ImageDraw.Draw(pil_image)
-    
-    # Color coding
+    # Color coding (RGB)
     colors = {
-        'excellent': '#00FF00',
-        'good': '#90EE90',
-        'fair': '#FFD700',
-        'poor': '#FFA500',
-        'very_poor': '#FF0000'
+        'excellent': (0, 255, 0),
+        'good': (144, 238, 144),
+        'fair': (255, 215, 0),
+        'poor': (255, 165, 0),
+        'very_poor': (255, 0, 0)
     }
+    white = (255, 255, 255)
+    black = (0, 0, 0)
     
     # Dot size
-    dot_size = max(8, min(20, image_array.shape[1] // 80))
+    dot_size = max(8, min(20, width // 80))
     line_width = max(2, dot_size // 4)
     
+    # Plain (x, y) int tuples for OpenCV
+    points = [tuple(point) for point in landmarks.tolist()]
+    
     # Draw reference lines
-    skull_pos = landmarks.get('skull', (0, 0))
-    ankle_center = ((landmarks['left_ankle'][0] + landmarks['right_ankle'][0])//2, 
-                    (landmarks['left_ankle'][1] + landmarks['right_ankle'][1])//2)
+    skull_pos = points[LM.SKULL]
+    ankle_center = ((points[LM.L_ANKLE][0] + points[LM.R_ANKLE][0])//2, 
+                    (points[LM.L_ANKLE][1] + points[LM.R_ANKLE][1])//2)
     
-    draw.line([skull_pos, ankle_center], fill='#FFFFFF', width=2)
+    cv2.line(canvas, skull_pos, ankle_center, white, 2, cv2.LINE_AA)
     
     # Horizontal reference lines
-    shoulder_y = landmarks['shoulder_center'][1]
-    hip_y = landmarks['hip_center'][1]
+    shoulder_y = points[LM.SHOULDER_C][1]
+    hip_y = points[LM.HIP_C][1]
     
-    draw.line([(0, shoulder_y), (image_array.shape[1], shoulder_y)], fill='#CCCCCC', width=1)
-    draw.line([(0, hip_y), (image_array.shape[1], hip_y)], fill='#CCCCCC', width=1)
+    cv2.line(canvas, (0, shoulder_y), (width, shoulder_y), (204, 204, 204), 1)
+    cv2.line(canvas, (0, hip_y), (width, hip_y), (204, 204, 204), 1)
     
     # Color function
     def get_score_color(score):
@@ -419,51 +486,53 @@ def create_annotated_image(image_array, landmarks, analysis):
         else:
             return colors['poor']
     
+    # Resolve each region color once
+    head_color = get_score_color(analysis.get('head_score', 2))
+    shoulder_color = get_score_color(analysis.get('shoulder_score', 2))
+    hip_color = get_score_color(analysis.get('hip_score', 2))
+    alignment_color = get_score_color(analysis.get('alignment_score', 2))
+    
     # Draw landmarks
     landmarks_to_draw = [
-        ('skull', 'Head Position', analysis.get('head_score', 2)),
-        ('left_shoulder', 'L Shoulder', analysis.get('shoulder_score', 2)),
-        ('right_shoulder', 'R Shoulder', analysis.get('shoulder_score', 2)),
-        ('left_hip', 'L Hip', analysis.get('hip_score', 2)),
-        ('right_hip', 'R Hip', analysis.get('hip_score', 2)),
-        ('left_knee', 'L Knee', analysis.get('alignment_score', 2)),
-        ('right_knee', 'R Knee', analysis.get('alignment_score', 2)),
-        ('left_ankle', 'L Ankle', analysis.get('alignment_score', 2)),
-        ('right_ankle', 'R Ankle', analysis.get('alignment_score', 2))
+        (LM.SKULL, head_color),
+        (LM.L_SHOULDER, shoulder_color),
+        (LM.R_SHOULDER, shoulder_color),
+        (LM.L_HIP, hip_color),
+        (LM.R_HIP, hip_color),
+        (LM.L_KNEE, alignment_color),
+        (LM.R_KNEE, alignment_color),
+        (LM.L_ANKLE, alignment_color),
+        (LM.R_ANKLE, alignment_color)
     ]
     
-    for landmark_key, label, score in landmarks_to_draw:
-        if landmark_key in landmarks:
-            pos = landmarks[landmark_key]
-            color = get_score_color(score)
-            
-            # Draw outer circle
-            draw.ellipse([
-                pos[0] - dot_size - 2, pos[1] - dot_size - 2,
-                pos[0] + dot_size + 2, pos[1] + dot_size + 2
-            ], fill='#FFFFFF')
-            
-            # Draw inner circle
-            draw.ellipse([
-                pos[0] - dot_size, pos[1] - dot_size,
-                pos[0] + dot_size, pos[1] + dot_size
-            ], fill=color)
-            
-            # Draw center dot
-            center_size = dot_size // 3
-            draw.ellipse([
-                pos[0] - center_size, pos[1] - center_size,
-                pos[0] + center_size, pos[1] + center_size
-            ], fill='#000000')
+    # Circle radii: white outline, score color, black center dot
+    outer_size = dot_size + 2
+    center_size = dot_size // 3
     
-    # Draw symmetry lines
-    draw.line([landmarks['left_shoulder'], landmarks['right_shoulder']], 
-              fill=get_score_color(analysis.get('shoulder_score', 2)), width=line_width)
+    for landmark_idx, color in landmarks_to_draw:
+        pos = points[landmark_idx]
+        cv2.circle(canvas, pos, outer_size, white, -1, cv2.LINE_AA)
+        cv2.circle(canvas, pos, dot_size, color, -1, cv2.LINE_AA)
+        cv2.circle(canvas, pos, center_size, black, -1, cv2.LINE_AA)
     
-    draw.line([landmarks['left_hip'], landmarks['right_hip']], 
-              fill=get_score_color(analysis.get('hip_score', 2)), width=line_width)
+    # Draw symmetry lines
+    cv2.line(canvas, points[LM.L_SHOULDER], points[LM.R_SHOULDER], shoulder_color, line_width, cv2.LINE_AA)
+    cv2.line(canvas, points[LM.L_HIP], points[LM.R_HIP], hip_color, line_width, cv2.LINE_AA)
     
-    return pil_image
+    return canvas
+
+def get_annotated_display_bytes(image_array, image_id, analysis):
+    """Annotate and encode an analysis once, reusing the JPEG bytes across reruns"""
+    signature = (
+        image_id,
+        analysis['landmarks'].tobytes(),
+        tuple(analysis[score_key] for _, score_key, _ in ASSESSMENT_REGIONS)
+    )
+    cached = st.session_state.annotated_image
+    if cached is None or cached[0] != signature:
+        annotated_image = create_annotated_image(image_array, analysis['landmarks'], analysis)
+        st.session_state.annotated_image = (signature, to_display_bytes(annotated_image))
+    return st.session_state.annotated_image[1]
 
 def analyze_posture(image_array):
     """Main posture analysis function"""
@@ -472,14 +541,17 @@ def analyze_posture(image_array):
     # Get landmarks
     landmarks = estimate_anatomical_landmarks(image_array)
     
+    return analyze_landmarks(landmarks, width, height)
+
+def analyze_landmarks(landmarks, width, height):
+    """Measure, score and assess a set of landmarks"""
     # Calculate measurements
     measurements = calculate_clinical_measurements(landmarks, width, height)
     
     # Calculate scores
-    head_score = calculate_head_score(measurements['head_alignment'])
-    shoulder_score = calculate_shoulder_score(measurements['shoulder_symmetry'])
-    hip_score = calculate_hip_score(measurements['hip_symmetry'])
-    alignment_score = calculate_alignment_score(measurements['vertical_alignment'])
+    head_score, shoulder_score, hip_score, alignment_score = score_frames(
+        [measurements[key] for key in MEASUREMENT_KEYS]
+    ).tolist()
     
     # Total score
     total_score = head_score + shoulder_score + hip_score + alignment_score
@@ -503,6 +575,36 @@ def analyze_posture(image_array):
     
     return analysis
 
+ANALYSIS_MAX_SIZE = 640
+
+def pil_to_array(image, chunk_bytes=256 * 1024):
+    """Copy a PIL image into an ndarray in row blocks, avoiding a full-size temporary"""
+    width, height = image.size
+    rows_per_chunk = max(1, chunk_bytes // (width * len(image.getbands())))
+    
+    image_array = None
+    for top in range(0, height, rows_per_chunk):
+        bottom = min(height, top + rows_per_chunk)
+        block = np.asarray(image.crop((0, top, width, bottom)))
+        if image_array is None:
+            image_array = np.empty((height,) + block.shape[1:], dtype=block.dtype)
+        image_array[top:bottom] = block
+    
+    return image_array
+
+def image_digest(image_bytes):
+    """Short content hash of an uploaded file, used as its analysis cache key"""
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def decode_and_analyze(_image_bytes, digest):
+    """Decode an uploaded photo and analyze it, cached on the file's content digest"""
+    image = Image.open(io.BytesIO(_image_bytes))
+    # Measurements are proportions, so analyze at a reduced resolution
+    image.thumbnail((ANALYSIS_MAX_SIZE, ANALYSIS_MAX_SIZE), Image.Resampling.BILINEAR)
+    image_array = pil_to_array(image)
+    return image_array, analyze_posture(image_array)
+
 def generate_exercise_recommendations(analysis):
     """Generate exercise recommendations"""
     recommendations = []
@@ -558,6 +660,17 @@ def generate_exercise_recommendations(analysis):
     
     return recommendations
 
+@st.cache_data(max_entries=128)
+def cached_exercise_recommendations(score_signature):
+    """Cache exercise recommendations on the four region scores"""
+    head_score, shoulder_score, hip_score, alignment_score = score_signature
+    return generate_exercise_recommendations({
+        'head_score': head_score,
+        'shoulder_score': shoulder_score,
+        'hip_score': hip_score,
+        'alignment_score': alignment_score
+    })
+
 def save_analysis_data(analysis_data, patient_name):
     """Save analysis to session state"""
     save_data = {
@@ -577,199 +690,278 @@ def save_analysis_data(analysis_data, patient_name):
     st.session_state.posture_analyses.append(save_data)
     return True
 
+PROGRESS_DISPLAY_COLUMNS = ['timestamp', 'patient', 'total_score', 'percentage', 'overall_assessment']
+
+# Sessions shown in the progress table unless the full history is requested
+PROGRESS_RECENT_ROWS = 50
+
+# Column dtypes for the progress table (scores are small integers, percentages need no float64)
+PROGRESS_DTYPES = {
+    'timestamp': 'datetime64[ns]',
+    'total_score': 'int16',
+    'percentage': 'float32',
+    'head_score': 'int8',
+    'shoulder_score': 'int8',
+    'hip_score': 'int8',
+    'alignment_score': 'int8'
+}
+
+def get_progress_dataframe(analyses):
+    """Build the typed progress DataFrame once per newly saved analysis"""
+    signature = (len(analyses), analyses[-1]['timestamp'])
+    cached = st.session_state.get('progress_df')
+    if cached is None or cached[0] != signature:
+        st.session_state.progress_df = (signature, pd.DataFrame(analyses).astype(PROGRESS_DTYPES))
+    return st.session_state.progress_df[1]
+
+def get_progress_display_table(analyses):
+    """Project and Arrow-convert the session table once per newly saved analysis"""
+    signature = (len(analyses), analyses[-1]['timestamp'])
+    cached = st.session_state.get('progress_table')
+    if cached is None or cached[0] != signature:
+        display_df = get_progress_dataframe(analyses)[PROGRESS_DISPLAY_COLUMNS]
+        st.session_state.progress_table = (signature, pa.Table.from_pandas(display_df, preserve_index=False))
+    return st.session_state.progress_table[1]
+
+# Longest edge of the landmark picker preview (the picker renders at most 900px wide)
+PICKER_MAX_SIZE = 1000
+
+# EXIF tag holding the camera orientation (1 = upright)
+EXIF_ORIENTATION = 0x0112
+
 def create_clickable_image_interface(image_array):
-    """Create an interactive interface for manual landmark placement"""
+    """Encode the (downscaled) photo as JPEG bytes for the landmark picker"""
     height, width = image_array.shape[:2]
     
-    # Convert to base64 for HTML display
-    pil_image = Image.fromarray(image_array.astype(np.uint8))
+    # Only the preview shrinks; the picker reports clicks as fractions of the image
+    scale_factor = min(1.0, PICKER_MAX_SIZE / max(height, width))
+    preview = image_array
+    if scale_factor < 1.0:
+        preview = cv2.resize(image_array, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_AREA)
     
-    # Resize image if it's too large to fit properly
-    max_height = 1200  # Increased from 800 to 1200
-    if height > max_height:
-        scale_factor = max_height / height
-        new_width = int(width * scale_factor)
-        new_height = max_height
-        pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    else:
-        new_width = width
-        new_height = height
-    
-    buffered = io.BytesIO()
-    pil_image.save(buffered, format="PNG")
-    img_base64 = base64.b64encode(buffered.getvalue()).decode()
-    
-    # Create the interactive HTML interface
-    html_interface = f"""
-    <div style="position: relative; display: inline-block; border: 2px solid #0066cc; border-radius: 10px; overflow: auto; width: 100%; max-width: 900px; max-height: 1200px; margin: 0 auto;">
-        <img id="postureImage" src="data:image/png;base64,{img_base64}" 
-             style="width: 100%; height: auto; display: block; cursor: crosshair;"
-             onclick="placeLandmark(event)">
-        
-        <div id="landmarks" style="position: absolute; top: 0; left: 0; width: 100%; height: 100%; pointer-events: none;">
-        </div>
-        
-        <div style="position: absolute; top: 10px; right: 10px; background: rgba(0,0,0,0.8); color: white; padding: 10px; border-radius: 5px; font-size: 12px;">
-            <div><strong>Click to place landmarks:</strong></div>
-            <div id="currentLandmark" style="color: #00ff00; font-weight: bold;">1. Skull/Head</div>
-            <div style="margin-top: 5px;">
-                <button onclick="resetLandmarks()" style="background: #ff4444; color: white; border: none; padding: 5px 10px; border-radius: 3px; cursor: pointer; margin-right: 5px;">Reset</button>
-                <button onclick="undoLast()" style="background: #ffaa00; color: white; border: none; padding: 5px 10px; border-radius: 3px; cursor: pointer;">Undo</button>
-            </div>
+    return to_jpeg_bytes(preview)
+
+# Landmark picker: a bidirectional component that returns the clicked points to Python
+LANDMARK_PICKER_HTML = """
+<div class="stage">
+    <img class="photo">
+    <div class="dots"></div>
+    <div class="panel">
+        <div><strong>Click to place landmarks:</strong></div>
+        <div class="current">1. Skull/Head</div>
+        <div class="buttons">
+            <button class="reset">Reset</button>
+            <button class="undo">Undo</button>
         </div>
     </div>
-    
-    <div style="margin-top: 15px; padding: 15px; background-color: rgba(0, 0, 0, 0.2); border-radius: 10px; border: 1px solid rgba(255, 255, 255, 0.2);">
-        <h4 style="color: #0066cc; margin-top: 0;">📍 Landmark Placement Guide:</h4>
-        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; font-size: 14px; color: inherit;">
-            <div><strong>1. Skull/Head:</strong> Top of head or ear level</div>
-            <div><strong>2. Left Shoulder:</strong> Acromion process (left side)</div>
-            <div><strong>3. Right Shoulder:</strong> Acromion process (right side)</div>
-            <div><strong>4. Left Hip:</strong> Greater trochanter (left side)</div>
-            <div><strong>5. Right Hip:</strong> Greater trochanter (right side)</div>
-            <div><strong>6. Left Knee:</strong> Lateral femoral condyle</div>
-            <div><strong>7. Right Knee:</strong> Lateral femoral condyle</div>
-            <div><strong>8. Left Ankle:</strong> Lateral malleolus</div>
-            <div><strong>9. Right Ankle:</strong> Lateral malleolus</div>
-        </div>
-        <div style="margin-top: 10px; font-size: 12px; color: inherit; opacity: 0.8;">
-            💡 <strong>Tip:</strong> Click directly on the anatomical landmarks. The system will calculate measurements once all 9 points are placed.
-        </div>
+</div>
+
+<div class="guide">
+    <h4>📍 Landmark Placement Guide:</h4>
+    <div class="guide-grid">
+        <div><strong>1. Skull/Head:</strong> Top of head or ear level</div>
+        <div><strong>2. Left Shoulder:</strong> Acromion process (left side)</div>
+        <div><strong>3. Right Shoulder:</strong> Acromion process (right side)</div>
+        <div><strong>4. Left Hip:</strong> Greater trochanter (left side)</div>
+        <div><strong>5. Right Hip:</strong> Greater trochanter (right side)</div>
+        <div><strong>6. Left Knee:</strong> Lateral femoral condyle</div>
+        <div><strong>7. Right Knee:</strong> Lateral femoral condyle</div>
+        <div><strong>8. Left Ankle:</strong> Lateral malleolus</div>
+        <div><strong>9. Right Ankle:</strong> Lateral malleolus</div>
+    </div>
+    <div class="tip">
+        💡 <strong>Tip:</strong> Click directly on the anatomical landmarks. The system will calculate measurements once all 9 points are placed.
     </div>
+</div>
+"""
+
+LANDMARK_PICKER_CSS = """
+.stage { position: relative; display: block; width: 100%; max-width: 900px; margin: 0 auto; border: 2px solid #0066cc; border-radius: 10px; overflow: hidden; }
+.photo { width: 100%; height: auto; display: block; cursor: crosshair; }
+.dots { position: absolute; inset: 0; pointer-events: none; }
+.dot { position: absolute; width: 16px; height: 16px; transform: translate(-50%, -50%); border-radius: 50%; border: 2px solid white; color: white; font-size: 10px; font-weight: bold; display: flex; align-items: center; justify-content: center; box-shadow: 0 2px 4px rgba(0,0,0,0.3); }
+.panel { position: absolute; top: 10px; right: 10px; background: rgba(0,0,0,0.8); color: white; padding: 10px; border-radius: 5px; font-size: 12px; }
+.current { color: #00ff00; font-weight: bold; }
+.buttons { margin-top: 5px; }
+.buttons button { color: white; border: none; padding: 5px 10px; border-radius: 3px; cursor: pointer; }
+.reset { background: #ff4444; margin-right: 5px; }
+.undo { background: #ffaa00; }
+.guide { margin-top: 15px; padding: 15px; background-color: rgba(0, 0, 0, 0.2); border-radius: 10px; border: 1px solid rgba(255, 255, 255, 0.2); }
+.guide h4 { color: #0066cc; margin-top: 0; }
+.guide-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 10px; font-size: 14px; }
+.tip { margin-top: 10px; font-size: 12px; opacity: 0.8; }
+"""
+
+LANDMARK_PICKER_JS = """
+const landmarkNames = [
+    'skull', 'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
+];
+const landmarkLabels = [
+    '1. Skull/Head', '2. Left Shoulder', '3. Right Shoulder', '4. Left Hip', '5. Right Hip',
+    '6. Left Knee', '7. Right Knee', '8. Left Ankle', '9. Right Ankle'
+];
+const landmarkColors = ['#ff0000', '#00ff00', '#00ff00', '#0000ff', '#0000ff', '#ffff00', '#ffff00', '#ff8800', '#ff8800'];
+
+export default function(component) {
+    const { data, parentElement, setStateValue } = component;
+    const image = parentElement.querySelector('.photo');
+    const dots = parentElement.querySelector('.dots');
+    const current = parentElement.querySelector('.current');
+    
+    // Placed points live on the mount point so they survive reruns
+    if (!parentElement.placedLandmarks) {
+        parentElement.placedLandmarks = [];
+        parentElement.publishedComplete = false;
+    }
+    const landmarks = parentElement.placedLandmarks;
+    let renderQueued = false;
     
-    <script>
-    let landmarkCount = 0;
-    let landmarks = [];
-    const landmarkNames = [
-        'skull', 'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
-        'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
-    ];
-    const landmarkLabels = [
-        '1. Skull/Head', '2. Left Shoulder', '3. Right Shoulder', '4. Left Hip', '5. Right Hip',
-        '6. Left Knee', '7. Right Knee', '8. Left Ankle', '9. Right Ankle'
-    ];
-    const landmarkColors = ['#ff0000', '#00ff00', '#00ff00', '#0000ff', '#0000ff', '#ffff00', '#ffff00', '#ff8800', '#ff8800'];
-    
-    function placeLandmark(event) {{
-        if (landmarkCount >= 9) return;
-        
-        const rect = event.target.getBoundingClientRect();
-        const x = ((event.clientX - rect.left) / rect.width * {width}).toFixed(0);
-        const y = ((event.clientY - rect.top) / rect.height * {height}).toFixed(0);
-        
-        landmarks.push({{
-            name: landmarkNames[landmarkCount],
-            x: parseInt(x),
-            y: parseInt(y),
-            color: landmarkColors[landmarkCount]
-        }});
+    // The photo arrives as raw JPEG bytes; show it through a blob URL instead of base64
+    if (parentElement.imageBytes !== data) {
+        if (parentElement.imageUrl) {
+            URL.revokeObjectURL(parentElement.imageUrl);
+        }
+        parentElement.imageBytes = data;
+        parentElement.imageUrl = URL.createObjectURL(new Blob([data], { type: 'image/jpeg' }));
+        image.src = parentElement.imageUrl;
+    }
+    
+    function render() {
+        dots.replaceChildren(...landmarks.map((landmark, i) => {
+            const dot = document.createElement('div');
+            dot.className = 'dot';
+            dot.style.left = (landmark.x * 100) + '%';
+            dot.style.top = (landmark.y * 100) + '%';
+            dot.style.backgroundColor = landmarkColors[i];
+            dot.textContent = i + 1;
+            return dot;
+        }));
+        current.textContent = landmarks.length < landmarkNames.length
+            ? landmarkLabels[landmarks.length]
+            : '✅ All landmarks placed!';
+    }
+    
+    // Coalesce dot redraws into one per animation frame
+    function scheduleRender() {
+        if (renderQueued) return;
+        renderQueued = true;
+        requestAnimationFrame(() => {
+            renderQueued = false;
+            render();
+        });
+    }
+    
+    // Intermediate clicks stay in the browser; only a complete set (or withdrawing one) reruns the app
+    function update() {
+        scheduleRender();
+        const complete = landmarks.length === landmarkNames.length;
+        if (complete || parentElement.publishedComplete) {
+            setStateValue('landmarks', landmarks.slice());
+            parentElement.publishedComplete = complete;
+        }
+    }
+    
+    image.onclick = (event) => {
+        if (landmarks.length >= landmarkNames.length) return;
         
-        addLandmarkDot(event.clientX - rect.left, event.clientY - rect.top, landmarkColors[landmarkCount], landmarkCount + 1);
-        landmarkCount++;
+        // Clicks are fractions of the displayed image; Python scales them to pixels
+        const rect = image.getBoundingClientRect();
+        landmarks.push({
+            name: landmarkNames[landmarks.length],
+            x: (event.clientX - rect.left) / rect.width,
+            y: (event.clientY - rect.top) / rect.height
+        });
+        update();
+    };
+    
+    parentElement.querySelector('.reset').onclick = () => {
+        landmarks.length = 0;
+        update();
+    };
+    
+    parentElement.querySelector('.undo').onclick = () => {
+        if (landmarks.length > 0) {
+            landmarks.pop();
+            update();
+        }
+    };
+    
+    render();
+}
+"""
+
+landmark_picker = st.components.v2.component(
+    "landmark_picker",
+    html=LANDMARK_PICKER_HTML,
+    css=LANDMARK_PICKER_CSS,
+    js=LANDMARK_PICKER_JS
+)
+
+MANUAL_LANDMARK_COUNT = 9
+
+def get_manual_upload(uploaded_file):
+    """Decode a manual-mode upload and encode its picker preview once per file"""
+    if st.session_state.get('manual_upload_id') != uploaded_file.file_id:
+        image = Image.open(uploaded_file)
+        image_array = pil_to_array(image)
         
-        updateCurrentLandmark();
+        # A small, upright JPEG is sent to the picker as uploaded instead of re-encoded
+        # (browsers apply EXIF rotation, which would not match the decoded pixels)
+        if (image.format == 'JPEG' and max(image.size) <= PICKER_MAX_SIZE
+                and image.getexif().get(EXIF_ORIENTATION, 1) == 1):
+            preview_jpeg = uploaded_file.getvalue()
+        else:
+            preview_jpeg = create_clickable_image_interface(image_array)
         
-        if (landmarkCount === 9) {{
-            document.getElementById('currentLandmark').innerHTML = '✅ All landmarks placed! Click Calculate below.';
-            // Store landmarks in Streamlit session state
-            window.parent.postMessage({{
-                type: 'landmarks_complete',
-                landmarks: landmarks
-            }}, '*');
-        }}
-    }}
-    
-    function addLandmarkDot(x, y, color, number) {{
-        const landmarksDiv = document.getElementById('landmarks');
-        const dot = document.createElement('div');
-        dot.style.position = 'absolute';
-        dot.style.left = (x - 8) + 'px';
-        dot.style.top = (y - 8) + 'px';
-        dot.style.width = '16px';
-        dot.style.height = '16px';
-        dot.style.borderRadius = '50%';
-        dot.style.backgroundColor = color;
-        dot.style.border = '2px solid white';
-        dot.style.color = 'white';
-        dot.style.fontSize = '10px';
-        dot.style.fontWeight = 'bold';
-        dot.style.display = 'flex';
-        dot.style.alignItems = 'center';
-        dot.style.justifyContent = 'center';
-        dot.style.boxShadow = '0 2px 4px rgba(0,0,0,0.3)';
-        dot.innerHTML = number;
-        dot.id = 'landmark_' + number;
-        landmarksDiv.appendChild(dot);
-    }}
-    
-    function updateCurrentLandmark() {{
-        if (landmarkCount < 9) {{
-            document.getElementById('currentLandmark').innerHTML = landmarkLabels[landmarkCount];
-        }}
-    }}
-    
-    function resetLandmarks() {{
-        landmarks = [];
-        landmarkCount = 0;
-        document.getElementById('landmarks').innerHTML = '';
-        updateCurrentLandmark();
-        window.parent.postMessage({{type: 'landmarks_reset'}}, '*');
-    }}
-    
-    function undoLast() {{
-        if (landmarkCount > 0) {{
-            landmarks.pop();
-            landmarkCount--;
-            document.getElementById('landmark_' + (landmarkCount + 1)).remove();
-            updateCurrentLandmark();
-        }}
-    }}
-    </script>
-    """
-    
-    return html_interface
-
-def process_manual_landmarks(manual_landmarks):
-    """Process manually placed landmarks"""
-    landmarks = {}
-    
-    for landmark in manual_landmarks:
-        landmarks[landmark['name']] = (landmark['x'], landmark['y'])
-    
-    # Calculate centers
-    if 'left_shoulder' in landmarks and 'right_shoulder' in landmarks:
-        left_s = landmarks['left_shoulder']
-        right_s = landmarks['right_shoulder']
-        landmarks['shoulder_center'] = ((left_s[0] + right_s[0])//2, (left_s[1] + right_s[1])//2)
-    
-    if 'left_hip' in landmarks and 'right_hip' in landmarks:
-        left_h = landmarks['left_hip']
-        right_h = landmarks['right_hip']
-        landmarks['hip_center'] = ((left_h[0] + right_h[0])//2, (left_h[1] + right_h[1])//2)
+        st.session_state.manual_upload_cache = (image_array, preview_jpeg)
+        st.session_state.manual_upload_id = uploaded_file.file_id
+    return st.session_state.manual_upload_cache
+
+def process_manual_landmarks(manual_landmarks, width, height):
+    """Process manually placed landmarks given as (x, y) fractions of the image"""
+    landmarks = empty_landmarks()
+    
+    # Scale all placed points to pixels and scatter them into their rows in one assignment
+    rows = [LANDMARK_INDEX[landmark['name']] for landmark in manual_landmarks]
+    fractions = np.fromiter(
+        (c for landmark in manual_landmarks for c in (landmark['x'], landmark['y'])),
+        dtype=np.float64, count=2 * len(rows)
+    ).reshape(-1, 2)
+    landmarks[rows] = np.rint(fractions * (width, height))
+    
+    # Calculate shoulder and hip centers together
+    landmarks[CENTER_ROWS] = (landmarks[LEFT_ROWS] + landmarks[RIGHT_ROWS]) // 2
     
     return landmarks
 
-# Custom CSS
-st.markdown("""
-<style>
-.stCamera > div {
-    width: 100% !important;
-    max-width: 800px !important;
-}
-.stCamera > div > div {
-    width: 100% !important;
-    height: 500px !important;
-    aspect-ratio: 16/10 !important;
-}
-.stCamera > div > div > div > video {
-    width: 100% !important;
-    height: 100% !important;
-    object-fit: cover !important;
-    border-radius: 10px !important;
-    border: 2px solid #0066cc !important;
-}
-</style>
-""", unsafe_allow_html=True)
+@st.fragment
+def render_clinical_instructions():
+    """Render the static sidebar instructions in an isolated fragment"""
+    st.header("📋 Clinical Instructions")
+    st.markdown(CLINICAL_INSTRUCTIONS)
+
+def analyze_and_render_photo(photo, show_original):
+    """Analyze an uploaded or captured photo and render the annotated result"""
+    # Decode and analyze posture (cached on the file's content digest)
+    with st.spinner("🔍 Performing clinical analysis..."):
+        image_bytes = photo.getvalue()
+        image_array, analysis = decode_and_analyze(image_bytes, image_digest(image_bytes))
+        # Store in session state for display
+        st.session_state.current_analysis = analysis
+    
+    # Create annotated image
+    annotated_bytes = get_annotated_display_bytes(image_array, photo.file_id, analysis)
+    
+    # Display images
+    if show_original:
+        img_col1, img_col2 = st.columns(2)
+        with img_col1:
+            st.image(get_original_display_bytes(image_array, photo.file_id), caption="📷 Original Photo", use_container_width=True)
+        with img_col2:
+            st.image(annotated_bytes, caption="🎯 Clinical Measurement Points", use_container_width=True)
+    else:
+        st.image(annotated_bytes, caption="🎯 Your Clinical Analysis", use_container_width=True)
 
 # Main App
 st.title("🏥 AI Clinical Assistant")
@@ -789,23 +981,7 @@ with st.sidebar:
     )
     
     st.markdown("---")
-    st.header("📋 Clinical Instructions")
-    st.markdown("""
-    **For optimal clinical analysis:**
-    
-    📸 **Photo Setup:**
-    - **Side view positioning** (90° to camera)
-    - Full body visible (head to feet)
-    - Arms relaxed at sides
-    - Natural standing position
-    - Good lighting, plain background
-    
-    🎯 **Measurement Points:**
-    - 🔴 **Red dots:** Poor alignment (Score 1)
-    - 🟠 **Orange dots:** Fair alignment (Score 2) 
-    - 🟡 **Yellow dots:** Good alignment (Score 3)
-    - 🟢 **Green dots:** Excellent alignment (Score 4)
-    """)
+    render_clinical_instructions()
 
 # Main content columns
 col1, col2 = st.columns([3, 2])
@@ -822,48 +998,20 @@ with col1:
         )
         
         if uploaded_file is not None:
-            image = Image.open(uploaded_file)
-            image_array = np.array(image)
-            
-            # Analyze posture
-            with st.spinner("🔍 Performing clinical analysis..."):
-                analysis = analyze_posture(image_array)
-                # Store in session state for display
-                st.session_state.current_analysis = analysis
-            
-            # Create annotated image
-            annotated_image = create_annotated_image(image_array, analysis['landmarks'], analysis)
-            
-            # Display images
-            img_col1, img_col2 = st.columns(2)
-            with img_col1:
-                st.image(image, caption="📷 Original Photo", use_container_width=True)
-            with img_col2:
-                st.image(annotated_image, caption="🎯 Clinical Measurement Points", use_container_width=True)
+            analyze_and_render_photo(uploaded_file, show_original=True)
         else:
             st.info("👆 Please upload an image to begin analysis")
     
     elif analysis_mode == "Take Photo (Vertical Full-Body)":
         st.info("📷 Camera optimized for vertical full-body capture")
-        st.markdown("**Instructions:** Stand facing or sideways to camera, full body visible in vertical frame")
+        # Camera widget styling is only needed in this mode
+        st.html(CAMERA_CSS)
+        st.markdown(CAMERA_INSTRUCTIONS)
         
         picture = st.camera_input("Take a side-view photo for clinical analysis")
         
         if picture is not None:
-            image = Image.open(picture)
-            image_array = np.array(image)
-            
-            # Analyze posture
-            with st.spinner("🔍 Performing clinical analysis..."):
-                analysis = analyze_posture(image_array)
-                # Store in session state for display
-                st.session_state.current_analysis = analysis
-            
-            # Create annotated image
-            annotated_image = create_annotated_image(image_array, analysis['landmarks'], analysis)
-            
-            # Display result
-            st.image(annotated_image, caption="🎯 Your Clinical Analysis", use_column_width=True)
+            analyze_and_render_photo(picture, show_original=False)
     
     elif analysis_mode == "Manual Landmark Placement":
         st.header("🎯 Manual Clinical Landmark Placement")
@@ -877,122 +1025,48 @@ with col1:
         )
         
         if uploaded_file is not None:
-            image = Image.open(uploaded_file)
-            image_array = np.array(image)
+            image_array, preview_jpeg = get_manual_upload(uploaded_file)
+            height, width = image_array.shape[:2]
             
             # Display interactive interface
             st.markdown("### 📍 Click on the image to place landmarks:")
             
-            # Create clickable interface
-            html_interface = create_clickable_image_interface(image_array)
-            st.components.v1.html(html_interface, height=1400, scrolling=True)
-            
-            # Calculate button appears immediately after the image interface
-            st.markdown("---")
-            
-            # Info message about using manual coordinates
-            st.info("⚠️ **Note:** The clickable interface is for visualization only. Please use the 'Manual Coordinate Entry' section below to enter the landmark positions you've identified, then click 'Use Manual Coordinates' followed by 'Calculate Clinical Analysis'.")
-            
-            # Reset button
-            if st.button("🔄 Reset View", use_container_width=True, key="reset_view"):
-                st.session_state.manual_landmarks = None
-                st.session_state.landmarks_placed = False
-                st.rerun()
+            picker = landmark_picker(
+                data=preview_jpeg,
+                key=f"landmark_picker_{uploaded_file.file_id}",
+                on_landmarks_change=lambda: None
+            )
+            placed_landmarks = picker.landmarks or []
             
-            # Manual landmark input as backup
             st.markdown("---")
-            st.markdown("### 🔧 Manual Coordinate Entry")
-            st.warning("📝 **Required:** After clicking landmarks above, enter their coordinates here to proceed with analysis")
             
-            # Manual landmark input
-            with st.form("landmark_coordinates_form"):
-                st.info("Look at the clicked landmarks above and enter their approximate pixel coordinates below")
+            if len(placed_landmarks) == MANUAL_LANDMARK_COUNT:
+                st.session_state.manual_landmarks = placed_landmarks
+                st.session_state.landmarks_placed = True
                 
-                coords_col1, coords_col2, coords_col3 = st.columns(3)
+                # Calculate clinical measurements from the placed points
+                landmarks = process_manual_landmarks(placed_landmarks, width, height)
+                analysis = analyze_landmarks(landmarks, width, height)
                 
-                manual_coords = {}
-                landmarks_list = [
-                    ('skull', 'Skull/Head', 'red'),
-                    ('left_shoulder', 'Left Shoulder', 'green'),
-                    ('right_shoulder', 'Right Shoulder', 'green'),
-                    ('left_hip', 'Left Hip', 'blue'),
-                    ('right_hip', 'Right Hip', 'blue'),
-                    ('left_knee', 'Left Knee', 'yellow'),
-                    ('right_knee', 'Right Knee', 'yellow'),
-                    ('left_ankle', 'Left Ankle', 'orange'),
-                    ('right_ankle', 'Right Ankle', 'orange')
-                ]
+                # Store analysis for display
+                st.session_state.current_analysis = analysis
                 
-                for i, (key, label, color) in enumerate(landmarks_list):
-                    col = [coords_col1, coords_col2, coords_col3][i % 3]
-                    with col:
-                        st.markdown(f"**{label}** <span style='color: {color};'>●</span>", unsafe_allow_html=True)
-                        x = st.number_input(f"X", key=f"{key}_x", min_value=0, max_value=image_array.shape[1], value=0)
-                        y = st.number_input(f"Y", key=f"{key}_y", min_value=0, max_value=image_array.shape[0], value=0)
-                        manual_coords[key] = (int(x), int(y))
+                # Create annotated image
+                annotated_bytes = get_annotated_display_bytes(image_array, uploaded_file.file_id, analysis)
                 
-                submitted = st.form_submit_button("✅ Confirm Coordinates & Analyze", use_container_width=True, type="primary")
+                # Display results
+                st.success("✅ Clinical analysis completed!")
                 
-                if submitted:
-                    # Check if all coordinates are set (not all zeros)
-                    if all(coords != (0, 0) for coords in manual_coords.values()):
-                        st.session_state.manual_landmarks = [
-                            {'name': key, 'x': coords[0], 'y': coords[1]} 
-                            for key, coords in manual_coords.items()
-                        ]
-                        st.session_state.landmarks_placed = True
-                        
-                        # Process manual landmarks immediately
-                        with st.spinner("🔍 Calculating clinical measurements..."):
-                            landmarks = process_manual_landmarks(st.session_state.manual_landmarks)
-                            
-                            # Calculate measurements
-                            measurements = calculate_clinical_measurements(landmarks, image_array.shape[1], image_array.shape[0])
-                            
-                            # Calculate scores
-                            head_score = calculate_head_score(measurements['head_alignment'])
-                            shoulder_score = calculate_shoulder_score(measurements['shoulder_symmetry'])
-                            hip_score = calculate_hip_score(measurements['hip_symmetry'])
-                            alignment_score = calculate_alignment_score(measurements['vertical_alignment'])
-                            
-                            # Total score
-                            total_score = head_score + shoulder_score + hip_score + alignment_score
-                            overall_percentage = (total_score / 16) * 100
-                            
-                            # Build analysis
-                            analysis = {
-                                'total_score': total_score,
-                                'max_score': 16,
-                                'percentage': overall_percentage,
-                                'head_score': head_score,
-                                'shoulder_score': shoulder_score,
-                                'hip_score': hip_score,
-                                'alignment_score': alignment_score,
-                                'landmarks': landmarks,
-                                'measurements': measurements
-                            }
-                            
-                            # Add assessments
-                            analysis.update(generate_detailed_assessments(analysis))
-                            
-                            # Store analysis for display
-                            st.session_state.current_analysis = analysis
-                        
-                        # Create annotated image
-                        annotated_image = create_annotated_image(image_array, landmarks, analysis)
-                        
-                        # Display results
-                        st.success("✅ Clinical analysis completed!")
-                        
-                        # Display images side by side
-                        st.markdown("### 📊 Analysis Results")
-                        img_col1, img_col2 = st.columns(2)
-                        with img_col1:
-                            st.image(image, caption="📷 Original Photo", use_container_width=True)
-                        with img_col2:
-                            st.image(annotated_image, caption="🎯 Manual Landmark Analysis", use_container_width=True)
-                    else:
-                        st.error("❌ Please enter valid coordinates for all landmarks (not all zeros)")
+                # Display images side by side
+                st.markdown("### 📊 Analysis Results")
+                img_col1, img_col2 = st.columns(2)
+                with img_col1:
+                    st.image(get_original_display_bytes(image_array, uploaded_file.file_id), caption="📷 Original Photo", use_container_width=True)
+                with img_col2:
+                    st.image(annotated_bytes, caption="🎯 Manual Landmark Analysis", use_container_width=True)
+            else:
+                st.session_state.landmarks_placed = False
+                st.info(f"📍 Place all {MANUAL_LANDMARK_COUNT} landmarks on the image. The analysis runs as soon as the last point is placed.")
 
 # Right column - Analysis results
 with col2:
@@ -1015,14 +1089,8 @@ with col2:
         st.progress(analysis['percentage'] / 100)
         
         # Overall status
-        if analysis['overall_color'] == 'success':
-            st.success(f"✅ {analysis['overall']}")
-        elif analysis['overall_color'] == 'info':
-            st.info(f"ℹ️ {analysis['overall']}")
-        elif analysis['overall_color'] == 'warning':
-            st.warning(f"⚠️ {analysis['overall']}")
-        else:
-            st.error(f"❌ {analysis['overall']}")
+        status_box, status_icon = STATUS_DISPLAY.get(analysis['overall_color'], (st.error, "❌"))
+        status_box(f"{status_icon} {analysis['overall']}")
         
         # Risk level using metric
         st.metric("Clinical Risk Level", analysis['risk_level'])
@@ -1030,12 +1098,17 @@ with col2:
         # Detailed measurements
         with st.expander("📏 Clinical Measurements", expanded=True):
             measurements = analysis['measurements']
+            head, shoulders, hips, vertical = (
+                measurements[k] for k in ('head_alignment', 'shoulder_symmetry', 'hip_symmetry', 'vertical_alignment')
+            )
             
             # Display assessments without HTML
-            st.write(f"{analysis['head_color']} **Head Position:** {analysis['head_assessment']}")
-            st.write(f"{analysis['shoulder_color']} **Shoulders:** {analysis['shoulder_assessment']}")
-            st.write(f"{analysis['hip_color']} **Hips:** {analysis['hip_assessment']}")
-            st.write(f"{analysis['alignment_color']} **Alignment:** {analysis['alignment_assessment']}")
+            st.markdown(
+                f"{analysis['head_color']} **Head Position:** {analysis['head_assessment']}  \n"
+                f"{analysis['shoulder_color']} **Shoulders:** {analysis['shoulder_assessment']}  \n"
+                f"{analysis['hip_color']} **Hips:** {analysis['hip_assessment']}  \n"
+                f"{analysis['alignment_color']} **Alignment:** {analysis['alignment_assessment']}"
+            )
             
             st.markdown("---")
             st.markdown("### 📊 Raw Measurements")
@@ -1043,11 +1116,11 @@ with col2:
             # Two column layout for measurements
             m1, m2 = st.columns(2)
             with m1:
-                st.metric("Head forward", f"{measurements['head_alignment']:.1f}%")
-                st.metric("Shoulder asymmetry", f"{measurements['shoulder_symmetry']:.1f}%")
+                st.metric("Head forward", f"{head:.1f}%")
+                st.metric("Shoulder asymmetry", f"{shoulders:.1f}%")
             with m2:
-                st.metric("Hip asymmetry", f"{measurements['hip_symmetry']:.1f}%")
-                st.metric("Vertical offset", f"{measurements['vertical_alignment']:.1f}%")
+                st.metric("Hip asymmetry", f"{hips:.1f}%")
+                st.metric("Vertical offset", f"{vertical:.1f}%")
         
         # Save button
         st.markdown("---")
@@ -1061,10 +1134,15 @@ with col2:
         st.subheader("💪 Clinical Exercise Prescription")
         st.markdown("*Based on quantified postural measurements*")
         
-        recommendations = generate_exercise_recommendations(analysis)
+        recommendations = cached_exercise_recommendations((
+            analysis.get('head_score', 4),
+            analysis.get('shoulder_score', 4),
+            analysis.get('hip_score', 4),
+            analysis.get('alignment_score', 4)
+        ))
         
-        for rec in recommendations:
-            st.write(rec)
+        # One markdown block instead of one element per line
+        st.markdown("\n\n".join(rec or "&nbsp;" for rec in recommendations))
     else:
         # Show placeholder when no analysis
         st.info("📊 **Clinical Analysis**\n\nResults will appear here after analysis")
@@ -1073,60 +1151,38 @@ with col2:
 st.markdown("---")
 
 if len(st.session_state.posture_analyses) > 0:
-    st.header("📈 Clinical Progress Tracking")
-    
-    analyses = st.session_state.posture_analyses
-    df = pd.DataFrame(analyses)
-    
-    # Summary metrics
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Clinical Analyses", len(df))
-    with col2:
-        st.metric("Average Score", f"{df['percentage'].mean():.1f}%")
-    with col3:
-        st.metric("Latest Score", f"{df['percentage'].iloc[-1]:.1f}%")
-    with col4:
-        if len(df) > 1:
-            improvement = df['percentage'].iloc[-1] - df['percentage'].iloc[0]
-            st.metric("Clinical Progress", f"{improvement:+.1f}%")
-        else:
-            st.metric("Clinical Progress", "Baseline")
-    
-    # Recent analyses
-    st.subheader("📋 Clinical Session Data")
-    display_df = df[['timestamp', 'patient', 'total_score', 'percentage', 'overall_assessment']]
-    st.dataframe(display_df, use_container_width=True)
+    with st.expander("📈 Clinical Progress Tracking", expanded=False):
+        analyses = st.session_state.posture_analyses
+        pct = get_progress_dataframe(analyses)['percentage'].to_numpy()
+        
+        # Summary metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Clinical Analyses", len(pct))
+        with col2:
+            st.metric("Average Score", f"{pct.mean():.1f}%")
+        with col3:
+            st.metric("Latest Score", f"{pct[-1]:.1f}%")
+        with col4:
+            if len(pct) > 1:
+                improvement = pct[-1] - pct[0]
+                st.metric("Clinical Progress", f"{improvement:+.1f}%")
+            else:
+                st.metric("Clinical Progress", "Baseline")
+        
+        # Recent analyses
+        st.subheader("📋 Clinical Session Data")
+        table = get_progress_display_table(analyses)
+        # Expanders can't nest, so the full history sits behind a toggle
+        if table.num_rows > PROGRESS_RECENT_ROWS and not st.toggle(f"Show all {table.num_rows} sessions"):
+            table = table.slice(table.num_rows - PROGRESS_RECENT_ROWS)
+        st.dataframe(table, use_container_width=True, height=400)
 
 # Clinical legend
 st.markdown("---")
 st.header("🎯 Clinical Measurement Legend")
-legend_col1, legend_col2 = st.columns(2)
-
-with legend_col1:
-    st.markdown("""
-    **📍 Measurement Points:**
-    - **Skull:** Head position assessment
-    - **Shoulders:** Left/right symmetry
-    - **Hips:** Pelvic level evaluation 
-    - **Knees:** Lower limb alignment
-    - **Ankles:** Base of support
-    """)
-
-with legend_col2:
-    st.markdown("""
-    **🎨 Color Coding:**
-    - 🟢 **Green:** Excellent (Score 4)
-    - 🟡 **Yellow:** Good (Score 3)
-    - 🟠 **Orange:** Fair (Score 2)
-    - 🔴 **Red:** Poor (Score 1)
-    """)
+st.markdown(LEGEND_HTML, unsafe_allow_html=True)
 
 # Footer
 st.markdown("---")
-st.markdown("""
-<div style='text-align: center; color: inherit; opacity: 0.7; font-size: 14px;'>
-💙 <strong>AI Clinical Assistant</strong> • Visual posture analysis with clinical measurement validation<br>
-Quantified assessment • Evidence-based scoring • Professional documentation
-</div>
-""", unsafe_allow_html=True)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
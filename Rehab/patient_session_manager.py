@@ -9,6 +9,14 @@ from datetime import datetime
 PATIENT_DB_PATH = "patient_database.csv"
 SESSION_LOG_PATH = "session_log.csv"
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_session_log(mtime, parse_dates=False):
+    """Read the session log; mtime keys the cache so new sessions invalidate it"""
+    session_df = pd.read_csv(SESSION_LOG_PATH)
+    if parse_dates:
+        session_df['Date'] = pd.to_datetime(session_df['Date'])
+    return session_df
+
 class PatientSessionManager:
     """Manages patient selection and data across all pages"""
     
@@ -29,6 +37,13 @@ class PatientSessionManager:
             return pd.read_csv(PATIENT_DB_PATH)
         return pd.DataFrame()
     
+    @staticmethod
+    def load_session_log(parse_dates=False):
+        """Load the session log, re-reading the CSV only after it changes on disk"""
+        if os.path.exists(SESSION_LOG_PATH):
+            return read_session_log(os.path.getmtime(SESSION_LOG_PATH), parse_dates)
+        return pd.DataFrame()
+    
     @staticmethod
     def get_current_patient():
         """Get currently selected patient data"""
@@ -139,7 +154,7 @@ class PatientSessionManager:
         if not patient_name or not os.path.exists(SESSION_LOG_PATH):
             return pd.DataFrame()
         
-        session_df = pd.read_csv(SESSION_LOG_PATH)
+        session_df = PatientSessionManager.load_session_log()
         return session_df[session_df['Athlete'] == patient_name]
     
     @staticmethod
@@ -152,10 +167,7 @@ class PatientSessionManager:
         session_data['Athlete'] = st.session_state.current_patient_name
         
         # Load existing sessions or create new dataframe
-        if os.path.exists(SESSION_LOG_PATH):
-            session_df = pd.read_csv(SESSION_LOG_PATH)
-        else:
-            session_df = pd.DataFrame()
+        session_df = PatientSessionManager.load_session_log()
         
         # Add new session
         new_session_df = pd.DataFrame([session_data])
@@ -7,6 +7,37 @@ import math
 from datetime import datetime
 import pandas as pd
 
+# Hop test normative data (research-based thresholds)
+HOP_THRESHOLDS = {
+    "ACL": {
+        "recreational": {"lsi_threshold": 90, "minimum_distance": 85},
+        "competitive": {"lsi_threshold": 95, "minimum_distance": 90},
+        "elite": {"lsi_threshold": 98, "minimum_distance": 95}
+    },
+    "Achilles": {
+        "recreational": {"lsi_threshold": 85, "minimum_distance": 80},
+        "competitive": {"lsi_threshold": 90, "minimum_distance": 85},
+        "elite": {"lsi_threshold": 95, "minimum_distance": 90}
+    },
+    "Hamstring": {
+        "recreational": {"lsi_threshold": 88, "minimum_distance": 82},
+        "competitive": {"lsi_threshold": 92, "minimum_distance": 87},
+        "elite": {"lsi_threshold": 96, "minimum_distance": 92}
+    }
+}
+
+# Hop tests in the battery; results are read from "<test>_injured" / "<test>_uninjured"
+HOP_TESTS = {
+    "single_hop": {"name": "Single Hop for Distance", "weight": 0.25},
+    "triple_hop": {"name": "Triple Hop for Distance", "weight": 0.25},
+    "crossover_hop": {"name": "Crossover Hop for Distance", "weight": 0.25},
+    "timed_hop": {
+        "name": "6m Timed Hop",
+        "weight": 0.25,
+        "reverse_scoring": True  # Lower time = better
+    }
+}
+
 def calculate_hop_test_battery(test_results, injury_type="ACL", sport_level="recreational"):
     """
     Calculate hop test battery results with LSI and normative comparisons
@@ -15,63 +46,16 @@ def calculate_hop_test_battery(test_results, injury_type="ACL", sport_level="rec
               Gokeler A, et al. Br J Sports Med. 2017;51(23):1651-1669.
     """
     
-    # Hop test normative data (research-based thresholds)
-    hop_thresholds = {
-        "ACL": {
-            "recreational": {"lsi_threshold": 90, "minimum_distance": 85},
-            "competitive": {"lsi_threshold": 95, "minimum_distance": 90},
-            "elite": {"lsi_threshold": 98, "minimum_distance": 95}
-        },
-        "Achilles": {
-            "recreational": {"lsi_threshold": 85, "minimum_distance": 80},
-            "competitive": {"lsi_threshold": 90, "minimum_distance": 85},
-            "elite": {"lsi_threshold": 95, "minimum_distance": 90}
-        },
-        "Hamstring": {
-            "recreational": {"lsi_threshold": 88, "minimum_distance": 82},
-            "competitive": {"lsi_threshold": 92, "minimum_distance": 87},
-            "elite": {"lsi_threshold": 96, "minimum_distance": 92}
-        }
-    }
-    
-    thresholds = hop_thresholds.get(injury_type, hop_thresholds["ACL"])
+    thresholds = HOP_THRESHOLDS.get(injury_type, HOP_THRESHOLDS["ACL"])
     level_thresholds = thresholds.get(sport_level, thresholds["recreational"])
     
-    hop_tests = {
-        "single_hop": {
-            "name": "Single Hop for Distance",
-            "injured_limb": test_results.get("single_hop_injured", 0),
-            "uninjured_limb": test_results.get("single_hop_uninjured", 0),
-            "weight": 0.25
-        },
-        "triple_hop": {
-            "name": "Triple Hop for Distance", 
-            "injured_limb": test_results.get("triple_hop_injured", 0),
-            "uninjured_limb": test_results.get("triple_hop_uninjured", 0),
-            "weight": 0.25
-        },
-        "crossover_hop": {
-            "name": "Crossover Hop for Distance",
-            "injured_limb": test_results.get("crossover_hop_injured", 0),
-            "uninjured_limb": test_results.get("crossover_hop_uninjured", 0),
-            "weight": 0.25
-        },
-        "timed_hop": {
-            "name": "6m Timed Hop",
-            "injured_limb": test_results.get("timed_hop_injured", 0),
-            "uninjured_limb": test_results.get("timed_hop_uninjured", 0),
-            "weight": 0.25,
-            "reverse_scoring": True  # Lower time = better
-        }
-    }
-    
     results = {}
     total_lsi = 0
     passed_tests = 0
     
-    for test_key, test_data in hop_tests.items():
-        injured = test_data["injured_limb"]
-        uninjured = test_data["uninjured_limb"]
+    for test_key, test_data in HOP_TESTS.items():
+        injured = test_results.get(f"{test_key}_injured", 0)
+        uninjured = test_results.get(f"{test_key}_uninjured", 0)
         
         if injured > 0 and uninjured > 0:
             if test_data.get("reverse_scoring", False):
@@ -136,6 +120,27 @@ def calculate_hop_test_battery(test_results, injury_type="ACL", sport_level="rec
         "test_date": datetime.now().strftime("%Y-%m-%d")
     }
 
+# Strength LSI thresholds (%) per muscle group
+STRENGTH_THRESHOLDS = {
+    "ACL": {
+        "knee_extension": 90,
+        "knee_flexion": 90,
+        "hip_abduction": 85,
+        "hip_extension": 85
+    },
+    "Achilles": {
+        "plantarflexion": 95,
+        "dorsiflexion": 85,
+        "inversion": 85,
+        "eversion": 85
+    },
+    "Hamstring": {
+        "knee_flexion": 95,
+        "hip_extension": 90,
+        "hip_abduction": 85
+    }
+}
+
 def calculate_strength_testing_battery(strength_data, injury_type="ACL"):
     """
     Comprehensive strength testing for RTS
@@ -143,27 +148,7 @@ def calculate_strength_testing_battery(strength_data, injury_type="ACL"):
     Based on: Schmitt LC, et al. J Orthop Sports Phys Ther. 2012;42(9):750-759.
     """
     
-    strength_thresholds = {
-        "ACL": {
-            "knee_extension": 90,
-            "knee_flexion": 90,
-            "hip_abduction": 85,
-            "hip_extension": 85
-        },
-        "Achilles": {
-            "plantarflexion": 95,
-            "dorsiflexion": 85,
-            "inversion": 85,
-            "eversion": 85
-        },
-        "Hamstring": {
-            "knee_flexion": 95,
-            "hip_extension": 90,
-            "hip_abduction": 85
-        }
-    }
-    
-    thresholds = strength_thresholds.get(injury_type, strength_thresholds["ACL"])
+    thresholds = STRENGTH_THRESHOLDS.get(injury_type, STRENGTH_THRESHOLDS["ACL"])
     
     strength_results = {}
     total_strength_index = 0